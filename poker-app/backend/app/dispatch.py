@@ -0,0 +1,109 @@
+from __future__ import annotations
+from typing import Any, Callable, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import math
+import os
+import threading
+import time
+
+from fastapi import HTTPException
+
+
+# CPU-bound equity work runs on a dedicated process pool so the event loop and
+# the threadpool stay free for cheap endpoints. At most `workers + queue_size`
+# jobs are admitted; beyond that requests are refused with 503 and a
+# Retry-After estimate. Each job carries a deadline: a job still queued when
+# its deadline passes is cancelled, and a worker that picks up an expired job
+# skips it.
+
+
+class Overloaded(Exception):
+    def __init__(self, retry_after: int):
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def _call(fn: Callable, args: Tuple, deadline: float) -> Tuple[str, Any]:
+    # Runs in the worker; HTTPException does not pickle, so errors travel as data
+    if time.time() > deadline:
+        return "expired", None
+    try:
+        return "ok", fn(*args)
+    except HTTPException as e:
+        return "http", (e.status_code, e.detail)
+
+
+class JobPool:
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.inflight = 0
+        self.avg_seconds = 0.5  # running mean of job durations, for Retry-After
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool
+
+    def retry_after(self) -> int:
+        waves = max(1, self.inflight - self.workers + 1) / self.workers
+        return max(1, math.ceil(self.avg_seconds * waves))
+
+    def _release(self, started: float) -> None:
+        with self._lock:
+            self.inflight -= 1
+            self.avg_seconds = 0.8 * self.avg_seconds + 0.2 * (time.monotonic() - started)
+
+    async def run(self, fn: Callable, *args: Any, timeout: float) -> Any:
+        """
+        Runs fn(*args) on the pool. Raises Overloaded when the queue is full and
+        DeadlineExceeded when no result arrives within `timeout` seconds.
+        """
+        with self._lock:
+            if self.inflight >= self.capacity:
+                raise Overloaded(self.retry_after())
+            self.inflight += 1
+        started = time.monotonic()
+        try:
+            future = self._executor().submit(_call, fn, args, time.time() + timeout)
+        except BaseException:
+            self._release(started)
+            raise
+        # The slot is held until the worker is really done, even after a timeout
+        future.add_done_callback(lambda _: self._release(started))
+        try:
+            status, value = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            raise DeadlineExceeded()
+        if status == "expired":
+            raise DeadlineExceeded()
+        if status == "http":
+            raise HTTPException(status_code=value[0], detail=value[1])
+        return value
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+JOB_POOL = JobPool(
+    workers=max(1, _env_int("EQUITY_JOB_WORKERS", os.cpu_count() or 1)),
+    queue_size=_env_int("EQUITY_QUEUE_SIZE", 8),
+)
+DEFAULT_DEADLINE_MS = _env_int("EQUITY_DEADLINE_MS", 30000)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+from typing import Dict, List, Optional
+from collections import OrderedDict
+from hashlib import sha256
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+from ..models import EquityRequest, EquityResult, PlayerInput, SeatEquity
+from .deck import COMBOS, COMBO_INDEX, Card, make_combo
+from .isomorphism import CARD_MAPS
+from .ranges import compile_range
+
+
+# Equity results keyed on a canonical form of the question: each player's
+# compiled range and folded flag (seat names excluded), the board and ranges up
+# to suit permutation, and every request field that changes the answer. Entries
+# are stored without seat names and relabelled on the way out.
+#
+# The memory tier is a bounded LRU. Setting EQUITY_CACHE_DB adds a SQLite tier
+# shared by every process on the host; its errors are ignored.
+
+CACHE_VERSION = 1  # bump when engines change their answers
+
+_COMBO_PERMS = np.array([[COMBO_INDEX[make_combo(m[a], m[b])] for a, b in COMBOS] for m in CARD_MAPS], dtype=np.intp)
+
+
+def _range_bits(mask: int) -> np.ndarray:
+    return np.unpackbits(np.frombuffer(mask.to_bytes(166, "little"), dtype=np.uint8), bitorder="little")[: len(COMBOS)]
+
+
+def result_key(kind: str, req: EquityRequest, board: List[Card]) -> Optional[str]:
+    """
+    Canonical cache key of a request, or None if it cannot be cached (e.g. a
+    range that fails to compile).
+    """
+    try:
+        bits = [_range_bits(0 if p.folded else compile_range(p.range.text).mask) for p in req.players]
+    except ValueError:
+        return None
+    best = None
+    for card_map, perm in zip(CARD_MAPS, _COMBO_PERMS):
+        permuted = []
+        for b in bits:
+            out = np.zeros_like(b)
+            out[perm] = b
+            permuted.append(np.packbits(out, bitorder="little").tobytes())
+        candidate = (tuple(sorted(card_map[c] for c in board)), tuple(permuted))
+        if best is None or candidate < best:
+            best = candidate
+    params = (
+        CACHE_VERSION,
+        kind,
+        req.method,
+        req.iterations,
+        req.seed,
+        req.workers,
+        req.targetError,
+        req.maxIterations,
+        req.timeLimitMs,
+        tuple(bool(p.folded) for p in req.players),
+    )
+    return sha256(repr((params, best)).encode()).hexdigest()
+
+
+def pack_result(result: EquityResult) -> Dict:
+    data = result.model_dump()
+    for s in data["perSeat"]:
+        del s["seat"]
+    return data
+
+
+def unpack_result(data: Dict, players: List[PlayerInput]) -> EquityResult:
+    per_seat = [SeatEquity(seat=p.seat, **s) for p, s in zip(players, data["perSeat"])]
+    return EquityResult(**{**data, "perSeat": per_seat})
+
+
+class ResultCache:
+    """
+    Bounded LRU of packed results, backed by an optional SQLite file.
+    """
+
+    def __init__(self, max_size: int = 2048, db_path: str | None = None):
+        self.max_size = max_size
+        self.entries: OrderedDict[str, Dict] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.db_path = db_path
+        self._db: sqlite3.Connection | None = None
+
+    def _conn(self) -> sqlite3.Connection | None:
+        if self.db_path and self._db is None:
+            try:
+                db = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+                db.commit()
+                self._db = db
+            except sqlite3.Error:
+                self.db_path = None
+        return self._db
+
+    def _remember(self, key: str, value: Dict) -> None:
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> Dict | None:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return value
+            db = self._conn()
+            if db is not None:
+                try:
+                    row = db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error:
+                    row = None
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Dict) -> None:
+        with self.lock:
+            if self.max_size > 0:
+                self._remember(key, value)
+            db = self._conn()
+            if db is not None:
+                try:
+                    db.execute("INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+                    db.commit()
+                except sqlite3.Error:
+                    pass
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "maxSize": self.max_size,
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk": bool(self.db_path),
+            }
+
+
+RESULT_CACHE = ResultCache(
+    max_size=int(os.environ.get("EQUITY_CACHE_SIZE") or 2048),
+    db_path=os.environ.get("EQUITY_CACHE_DB") or None,
+)
@@ -9,11 +9,31 @@ rank_to_value = {r: i + 2 for i, r in enumerate(RANK_ORDER)}
 value_to_rank = {v: r for r, v in rank_to_value.items()}
 
 
-Card = Tuple[int, str]  # (rank 2..14, suit 's','h','d','c')
+# Cards are ints 0..51: id = (rank - 2) * 4 + suit index (SUITS order).
+# Sets of cards (hands, boards, dead cards) are 52-bit masks: bit id is set.
+Card = int
+Combo = Tuple[int, int]  # (high id, low id)
+
+CARD_STRS: List[str] = [f"{r}{s}" for r in RANK_ORDER for s in SUITS]
+CARD_IDS = {s: i for i, s in enumerate(CARD_STRS)}
+CARD_RANKS: List[int] = [i // 4 + 2 for i in range(52)]  # 2..14
+CARD_SUITS: List[int] = [i % 4 for i in range(52)]
+CARD_BITS: List[int] = [1 << i for i in range(52)]
+FULL_MASK = (1 << 52) - 1
+
+# All 1326 two-card combos in a fixed order, with their card masks.
+COMBOS: List[Combo] = [(hi, lo) for hi in range(52) for lo in range(hi)]
+COMBO_MASKS: List[int] = [CARD_BITS[hi] | CARD_BITS[lo] for hi, lo in COMBOS]
+COMBO_INDEX = {c: i for i, c in enumerate(COMBOS)}
+# Per card, the 1326-bit mask (bit = combo index) of the combos holding it
+CARD_COMBO_MASKS: List[int] = [0] * 52
+for _i, (_hi, _lo) in enumerate(COMBOS):
+    CARD_COMBO_MASKS[_hi] |= 1 << _i
+    CARD_COMBO_MASKS[_lo] |= 1 << _i
 
 
 def make_card(rank_char: str, suit_char: str) -> Card:
-    return (rank_to_value[rank_char.upper()], suit_char.lower())
+    return (rank_to_value[rank_char.upper()] - 2) * 4 + SUITS.index(suit_char.lower())
 
 
 def parse_card(s: str) -> Card:
@@ -23,30 +43,66 @@ def parse_card(s: str) -> Card:
     r, su = s[0].upper(), s[1].lower()
     if r not in rank_to_value or su not in SUITS:
         raise ValueError(f"invalid card: {s}")
-    return (rank_to_value[r], su)
+    return CARD_IDS[r + su]
 
 
 def card_to_str(c: Card) -> str:
-    return f"{value_to_rank[c[0]]}{c[1]}"
+    return CARD_STRS[c]
+
+
+def card_rank(c: Card) -> int:
+    return CARD_RANKS[c]
+
+
+def card_suit(c: Card) -> str:
+    return SUITS[CARD_SUITS[c]]
+
+
+def make_combo(a: Card, b: Card) -> Combo:
+    return (a, b) if a > b else (b, a)
+
+
+def combo_index(a: Card, b: Card) -> int:
+    return COMBO_INDEX[make_combo(a, b)]
+
+
+def combo_to_str(c: Combo) -> str:
+    return CARD_STRS[c[0]] + CARD_STRS[c[1]]
 
 
 def parse_board(cards: Iterable[str]) -> List[Card]:
     out: List[Card] = []
-    seen: Set[str] = set()
+    seen = 0
     for s in cards:
         c = parse_card(s)
-        ss = card_to_str(c)
-        if ss in seen:
+        if seen & CARD_BITS[c]:
             raise ValueError(f"duplicate card on board: {s}")
-        seen.add(ss)
+        seen |= CARD_BITS[c]
         out.append(c)
     return out
 
 
-def full_deck() -> List[Card]:
-    return [(rank_to_value[r], s) for r in RANK_ORDER for s in SUITS]
+def mask_of(cards: Iterable[Card]) -> int:
+    m = 0
+    for c in cards:
+        m |= CARD_BITS[c]
+    return m
+
+
+def cards_of(mask: int) -> List[Card]:
+    out: List[Card] = []
+    while mask:
+        low = mask & -mask
+        out.append(low.bit_length() - 1)
+        mask ^= low
+    return out
 
 
-def remove_cards(deck: List[Card], dead: Set[str]) -> List[Card]:
-    return [c for c in deck if card_to_str(c) not in dead]
+def full_deck() -> List[Card]:
+    return list(range(52))
+
 
+def remove_cards(deck: List[Card], dead: int | Set[Card]) -> List[Card]:
+    if not isinstance(dead, int):
+        dead = mask_of(dead)
+    return [c for c in deck if not dead & CARD_BITS[c]]
@@ -1,12 +1,18 @@
 from __future__ import annotations
-from typing import List, Tuple, Dict, Iterable
+from typing import Callable, List, Tuple, Dict, Iterable
 import random
+import time
+from bisect import bisect_left, bisect_right
 from itertools import combinations
 
+import numpy as np
+
 from ..models import PlayerInput, SeatEquity
-from .deck import parse_board, card_to_str, full_deck, remove_cards
+from .deck import CARD_BITS, Card, Combo, full_deck, mask_of, remove_cards
 from .ranges import expand_range_text
-from .evaluator import rank7
+from .isomorphism import board_stabilizer, fixing_ranges, runout_classes
+from .sampler import ComboSampler
+from .evaluator import batch_keys, rank7, rank_batch_keys
 
 
 def _active_players(players: List[PlayerInput]):
@@ -19,18 +25,11 @@ def _active_players(players: List[PlayerInput]):
     return out
 
 
-def compute_equity_mc(
-    players: List[PlayerInput],
-    board: Iterable[tuple] | Iterable[str] | None,
-    iterations: int = 30000,
-    seed: int | None = None,
-) -> List[SeatEquity]:
-    rng = random.Random(seed)
-    board_cards = list(board or [])
-    dead = set(card_to_str(c) if isinstance(c, tuple) else c for c in board_cards)
-
+def _expand_players(
+    players: List[PlayerInput], board_cards: List[Card]
+) -> Tuple[List[str], List[bool], List[List[Combo]]]:
     # Expand ranges with blocker filtering by board
-    expanded: List[List[Tuple[tuple, tuple]]] = []
+    expanded: List[List[Combo]] = []
     seats: List[str] = []
     folded_mask: List[bool] = []
     for p in players:
@@ -39,88 +38,27 @@ def compute_equity_mc(
         if p.folded:
             expanded.append([])
             continue
-        combos, _ = expand_range_text(p.range.text, board)
+        combos, _ = expand_range_text(p.range.text, board_cards)
         expanded.append(combos)
+    return seats, folded_mask, expanded
 
-    # Participation check
-    participating_idx = [i for i in range(len(players)) if not folded_mask[i] and expanded[i]]
-    if len(participating_idx) < 2:
-        # No competition
-        result: List[SeatEquity] = []
-        for i, seat in enumerate(seats):
-            result.append(
-                SeatEquity(seat=seat, equity=0.0, tie=0.0, participating=not folded_mask[i])
-            )
-        return result
-
-    wins = [0.0 for _ in players]
-    ties = [0.0 for _ in players]
-    trials = 0
-
-    all_deck = [c for c in full_deck()]
-    # Precompute a deck of strings for speed
-    all_deck_str = [card_to_str(c) for c in all_deck]
-
-    need_board = 5 - len(board_cards)
-
-    for _ in range(iterations):
-        used = set(dead)
-        sampled: List[Tuple[tuple, tuple] | None] = [None for _ in players]
 
-        ok = True
-        # Sample hole cards per player uniformly with blocker constraints
-        for i in range(len(players)):
-            if folded_mask[i]:
-                continue
-            combos = [c for c in expanded[i] if card_to_str(c[0]) not in used and card_to_str(c[1]) not in used]
-            if not combos:
-                ok = False
-                break
-            choice = rng.choice(combos)
-            sampled[i] = (choice[0], choice[1])
-            used.add(card_to_str(choice[0]))
-            used.add(card_to_str(choice[1]))
-
-        if not ok:
-            continue
-
-        # Draw remaining board cards uniformly
-        if need_board > 0:
-            remaining = [s for s in all_deck_str if s not in used]
-            rng.shuffle(remaining)
-            draw = remaining[:need_board]
-            full_board = list(board_cards) + [
-                next(c for c in all_deck if card_to_str(c) == s) for s in draw
-            ]
-        else:
-            full_board = list(board_cards)
-
-        # Evaluate
-        ranks = []
-        for i in range(len(players)):
-            if folded_mask[i]:
-                ranks.append(None)
-                continue
-            h = sampled[i]
-            if not h:
-                ok = False
-                break
-            seven = [h[0], h[1], *full_board]
-            ranks.append(rank7(seven))
-        if not ok:
-            continue
+def _no_contest(seats: List[str], folded_mask: List[bool]) -> List[SeatEquity]:
+    return [
+        SeatEquity(seat=seat, equity=0.0, tie=0.0, participating=not folded_mask[i])
+        for i, seat in enumerate(seats)
+    ]
 
-        best = max(r for r in ranks if r is not None)
-        winners = [i for i, r in enumerate(ranks) if r == best]
-        trials += 1
-        if len(winners) == 1:
-            wins[winners[0]] += 1.0
-        else:
-            share = 1.0 / len(winners)
-            for wi in winners:
-                wins[wi] += share
-                ties[wi] += share
 
+def _seat_results(
+    seats: List[str],
+    folded_mask: List[bool],
+    expanded: List[List[Combo]],
+    participating_idx: List[int],
+    tally: Tally,
+    exact: bool = False,
+) -> List[SeatEquity]:
+    wins, ties, trials = tally.wins, tally.ties, tally.trials
     per_seat: List[SeatEquity] = []
     if trials == 0:
         for i, seat in enumerate(seats):
@@ -140,13 +78,405 @@ def compute_equity_mc(
         else:
             eq = (wins[i] / trials) * 100.0
             ti = (ties[i] / trials) * 100.0
-            per_seat.append(SeatEquity(seat=seat, equity=eq, tie=ti, participating=True))
+            per_seat.append(SeatEquity(seat=seat, equity=eq, tie=ti, participating=True, ci=None if exact else tally.half_width(i)))
     return per_seat
 
 
+_Z95 = 1.959964
+
+
+class Tally:
+    """
+    Monte Carlo counts per player (indexed like the request's players).
+    `sq` sums each trial's squared pot share, for the standard error.
+    Batches and shards add into one tally; merging is in a fixed order, so
+    totals are reproducible.
+    """
+
+    __slots__ = ("wins", "ties", "sq", "trials")
+
+    def __init__(self, n_players: int):
+        self.wins = [0.0] * n_players
+        self.ties = [0.0] * n_players
+        self.sq = [0.0] * n_players
+        self.trials = 0
+
+    def merge(self, other: "Tally") -> None:
+        for i in range(len(self.wins)):
+            self.wins[i] += other.wins[i]
+            self.ties[i] += other.ties[i]
+            self.sq[i] += other.sq[i]
+        self.trials += other.trials
+
+    def half_width(self, i: int) -> float:
+        """
+        95% confidence half-width of player i's equity, in percentage points.
+        """
+        n = self.trials
+        if n == 0:
+            return 0.0
+        mean = self.wins[i] / n
+        var = max(self.sq[i] / n - mean * mean, 0.0)
+        return _Z95 * (var / n) ** 0.5 * 100.0
+
+
+def _scalar_runner(
+    expanded: List[List[Combo]], folded_mask: List[bool], board_cards: List[Card], rng: random.Random
+) -> Tuple[Callable[[int, Tally], None], List[ComboSampler]]:
+    """
+    Returns run(iterations, tally), which plays that many scalar Monte Carlo
+    iterations into the tally (iterations with no valid deal are skipped, as
+    before), and the per-player combo samplers.
+    """
+    dead = mask_of(board_cards)
+    samplers = [ComboSampler(combos, rng) for combos in expanded]
+    all_deck = full_deck()
+    need_board = 5 - len(board_cards)
+    n_players = len(expanded)
+
+    def run(iterations: int, tally: Tally) -> None:
+        wins = tally.wins
+        ties = tally.ties
+        sq = tally.sq
+        trials = 0
+        for _ in range(iterations):
+            used = dead
+            sampled: List[Combo | None] = [None for _ in range(n_players)]
+
+            ok = True
+            # Sample hole cards per player uniformly with blocker constraints
+            for i in range(n_players):
+                if folded_mask[i]:
+                    continue
+                sampler = samplers[i]
+                j = sampler.sample(used)
+                if j < 0:
+                    ok = False
+                    break
+                sampled[i] = sampler.combos[j]
+                used |= sampler.masks[j]
+
+            if not ok:
+                continue
+
+            # Draw remaining board cards uniformly
+            if need_board > 0:
+                remaining = remove_cards(all_deck, used)
+                rng.shuffle(remaining)
+                full_board = board_cards + remaining[:need_board]
+            else:
+                full_board = list(board_cards)
+
+            # Evaluate
+            ranks = []
+            for i in range(n_players):
+                if folded_mask[i]:
+                    ranks.append(None)
+                    continue
+                h = sampled[i]
+                seven = [h[0], h[1], *full_board]
+                ranks.append(rank7(seven))
+
+            best = max(r for r in ranks if r is not None)
+            winners = [i for i, r in enumerate(ranks) if r == best]
+            trials += 1
+            if len(winners) == 1:
+                wins[winners[0]] += 1.0
+                sq[winners[0]] += 1.0
+            else:
+                share = 1.0 / len(winners)
+                for wi in winners:
+                    wins[wi] += share
+                    ties[wi] += share
+                    sq[wi] += share * share
+        tally.trials += trials
+
+    return run, samplers
+
+
+# Vectorized Monte Carlo: rows of a batch are independent trials.
+_VEC_BATCH = 1 << 17
+_VEC_MAX_DRAWS = 64  # give up after drawing this many rows per requested trial
+# Bit per card id; ids 52..63 map to bit 63, which every used mask carries, so
+# drawing 6 random bits and redrawing on collision yields uniform unused cards.
+_DRAW_BITS = np.array([1 << c for c in range(52)] + [1 << 63] * 12, dtype=np.uint64)
+_SENTINEL = np.uint64(1 << 63)
+
+
+def _uniform_below(bitgen, k: int, n: int) -> np.ndarray:
+    # Exactly uniform ints in [0, k): Lemire's multiply-shift on 32-bit draws,
+    # redrawing the rare low products that would bias the result
+    threshold = np.uint64((1 << 32) % k)
+    m = bitgen.random_raw((n + 1) // 2).view(np.uint32)[:n].astype(np.uint64) * np.uint64(k)
+    bad = np.nonzero((m & np.uint64(0xFFFFFFFF)) < threshold)[0]
+    while bad.size:
+        m[bad] = bitgen.random_raw((bad.size + 1) // 2).view(np.uint32)[: bad.size].astype(np.uint64) * np.uint64(k)
+        bad = bad[(m[bad] & np.uint64(0xFFFFFFFF)) < threshold]
+    return (m >> np.uint64(32)).astype(np.intp)
+
+
+def _draw_runout_card(bitgen, used: np.ndarray) -> np.ndarray:
+    # One card per row, uniform over the cards not in the row's used mask
+    n = used.size
+    cards = (bitgen.random_raw((n + 7) // 8).view(np.uint8)[:n] & 63).astype(np.intp)
+    bits = _DRAW_BITS[cards]
+    bad = np.nonzero(used & bits)[0]
+    while bad.size:
+        redraw = (bitgen.random_raw((bad.size + 7) // 8).view(np.uint8)[: bad.size] & 63).astype(np.intp)
+        cards[bad] = redraw
+        bits[bad] = _DRAW_BITS[redraw]
+        bad = bad[(used[bad] & bits[bad]) != 0]
+    used |= bits
+    return cards
+
+
+def _vector_runner(
+    expanded: List[List[Combo]], participating_idx: List[int], board_cards: List[Card], bitgen
+) -> Callable[[int, Tally], None]:
+    """
+    Returns run(trials, tally) for the vectorized engine. Every participating
+    player draws a combo uniformly and independently; rows with overlapping
+    hole cards are rejected, so accepted deals are uniform over
+    non-conflicting combo tuples. Runouts are drawn from the unused cards by
+    per-card rejection against the row's card mask, and hands are scored with
+    the batch evaluator using the board's key sums once per row.
+    """
+    dead = np.uint64(mask_of(board_cards)) | _SENTINEL
+    hole_masks = []
+    hole_keys = []
+    hole_suit_masks = []
+    for i in participating_idx:
+        arr = np.array(expanded[i], dtype=np.intp)
+        hole_masks.append(_DRAW_BITS[arr[:, 0]] | _DRAW_BITS[arr[:, 1]])
+        k, sm = batch_keys(arr)
+        hole_keys.append(k)
+        hole_suit_masks.append(sm)
+    board_key, board_suit_mask = batch_keys(np.array(board_cards, dtype=np.intp))
+    need_board = 5 - len(board_cards)
+
+    def run(iterations: int, tally: Tally) -> None:
+        trials = 0
+        drawn = 0
+        accept = 1.0
+        while trials < iterations and drawn < iterations * _VEC_MAX_DRAWS:
+            want = iterations - trials
+            n = int(min(_VEC_BATCH, max(1024, want / max(accept, 1e-3) * 1.1)))
+            drawn += n
+
+            # Hole cards, dropping rows as soon as a combo shares a card
+            used = np.full(n, dead, dtype=np.uint64)
+            rows = np.arange(n)
+            stages = []
+            for m in hole_masks:
+                idx = _uniform_below(bitgen, len(m), rows.size)
+                cm = m[idx]
+                ok = np.nonzero((used & cm) == 0)[0]
+                stages.append((rows, idx))
+                rows = rows[ok]
+                used = used[ok] | cm[ok]
+            accept = 0.5 * accept + 0.5 * (rows.size / n)
+            rows = rows[:want]
+            used = used[:want]
+            if rows.size == 0:
+                continue
+            picks = []
+            scratch = np.empty(n, dtype=np.intp)
+            for stage_rows, idx in stages:
+                scratch[stage_rows] = idx
+                picks.append(scratch[rows])
+            n = rows.size
+
+            # Runout keys accumulate on top of the board's
+            key = np.full(n, board_key, dtype=np.int64)
+            suit_mask = np.full(n, board_suit_mask, dtype=np.uint64)
+            for _ in range(need_board):
+                k, sm = batch_keys(_draw_runout_card(bitgen, used)[:, None])
+                key += k
+                suit_mask += sm
+
+            ranks = [
+                rank_batch_keys(key + hole_keys[j][idx], suit_mask + hole_suit_masks[j][idx])
+                for j, idx in enumerate(picks)
+            ]
+            best = ranks[0].copy()
+            for r in ranks[1:]:
+                np.maximum(best, r, out=best)
+            won = [r == best for r in ranks]
+            n_won = won[0].astype(np.int8)
+            for w in won[1:]:
+                n_won += w
+            # Split pots are rare: count plain wins, then share out ties
+            tied = np.nonzero(n_won > 1)[0]
+            share = 1.0 / n_won[tied]
+            for j, w in enumerate(won):
+                shares = share[w[tied]]
+                tie_share = float(shares.sum())
+                sole = np.count_nonzero(w) - shares.size
+                i = participating_idx[j]
+                tally.wins[i] += sole + tie_share
+                tally.ties[i] += tie_share
+                tally.sq[i] += sole + float((shares * shares).sum())
+            trials += n
+        tally.trials += trials
+
+    return run
+
+
+def _prepare(
+    players: List[PlayerInput], board: Iterable[Card] | None
+) -> Tuple[List[Card], List[str], List[bool], List[List[Combo]], List[int]]:
+    board_cards = list(board or [])
+    seats, folded_mask, expanded = _expand_players(players, board_cards)
+    participating_idx = [i for i in range(len(players)) if not folded_mask[i] and expanded[i]]
+    return board_cards, seats, folded_mask, expanded, participating_idx
+
+
+def mc_tally(
+    players: List[PlayerInput],
+    board: Iterable[Card] | None,
+    iterations: int,
+    seed: int | None = None,
+    method: str = "mc",
+) -> Tally:
+    """
+    Raw Monte Carlo counts for the scalar ("mc") or "vectorized" engine.
+    """
+    board_cards, seats, folded_mask, expanded, participating_idx = _prepare(players, board)
+    tally = Tally(len(players))
+    if len(participating_idx) < 2:
+        return tally
+    if method == "vectorized":
+        run = _vector_runner(expanded, participating_idx, board_cards, np.random.default_rng(seed).bit_generator)
+    else:
+        run, _ = _scalar_runner(expanded, folded_mask, board_cards, random.Random(seed))
+    run(iterations, tally)
+    return tally
+
+
+def tally_results(players: List[PlayerInput], board: Iterable[Card] | None, tally: Tally) -> List[SeatEquity]:
+    board_cards, seats, folded_mask, expanded, participating_idx = _prepare(players, board)
+    if len(participating_idx) < 2:
+        return _no_contest(seats, folded_mask)
+    return _seat_results(seats, folded_mask, expanded, participating_idx, tally)
+
+
+def compute_equity_mc(
+    players: List[PlayerInput],
+    board: Iterable[Card] | None,
+    iterations: int = 30000,
+    seed: int | None = None,
+    stats: Dict[str, object] | None = None,
+) -> List[SeatEquity]:
+    """
+    Scalar Monte Carlo. Hole cards come from one ComboSampler per player; if
+    `stats` is given it receives the samplers' acceptance statistics by seat.
+    """
+    board_cards, seats, folded_mask, expanded, participating_idx = _prepare(players, board)
+    if len(participating_idx) < 2:
+        # No competition
+        return _no_contest(seats, folded_mask)
+
+    tally = Tally(len(players))
+    run, samplers = _scalar_runner(expanded, folded_mask, board_cards, random.Random(seed))
+    run(iterations, tally)
+    if stats is not None:
+        stats["samplers"] = {seats[i]: samplers[i].stats() for i in participating_idx}
+    return _seat_results(seats, folded_mask, expanded, participating_idx, tally)
+
+
+def compute_equity_mc_vectorized(
+    players: List[PlayerInput],
+    board: Iterable[Card] | None,
+    iterations: int = 30000,
+    seed: int | None = None,
+) -> Tuple[List[SeatEquity], int]:
+    """
+    Monte Carlo over NumPy batches (see _vector_runner). Returns
+    (per_seat, trials).
+    """
+    board_cards, seats, folded_mask, expanded, participating_idx = _prepare(players, board)
+    if len(participating_idx) < 2:
+        return _no_contest(seats, folded_mask), 0
+    tally = Tally(len(players))
+    run = _vector_runner(expanded, participating_idx, board_cards, np.random.default_rng(seed).bit_generator)
+    run(iterations, tally)
+    return _seat_results(seats, folded_mask, expanded, participating_idx, tally), tally.trials
+
+
+# Adaptive MC: first batch size and default trial cap per engine
+_ADAPTIVE_FIRST = {"mc": 1000, "vectorized": 20000}
+_ADAPTIVE_CAP = {"mc": 100_000, "vectorized": 5_000_000}
+
+
+def compute_equity_adaptive(
+    players: List[PlayerInput],
+    board: Iterable[Card] | None,
+    target_error: float,
+    max_iterations: int | None = None,
+    time_limit_ms: int | None = None,
+    seed: int | None = None,
+    method: str = "mc",
+) -> Tuple[List[SeatEquity], int, float]:
+    """
+    Monte Carlo in growing batches until every seat's 95% half-width (in
+    equity percentage points) is at most `target_error`, the trial cap is
+    reached or the time limit runs out. Each batch is sized from the current
+    variance estimate. Returns (per_seat, trials, achieved error).
+    """
+    board_cards, seats, folded_mask, expanded, participating_idx = _prepare(players, board)
+    if len(participating_idx) < 2:
+        return _no_contest(seats, folded_mask), 0, 0.0
+    if method == "vectorized":
+        run = _vector_runner(expanded, participating_idx, board_cards, np.random.default_rng(seed).bit_generator)
+    else:
+        run, _ = _scalar_runner(expanded, folded_mask, board_cards, random.Random(seed))
+    cap = max_iterations or _ADAPTIVE_CAP.get(method, _ADAPTIVE_CAP["mc"])
+    deadline = time.perf_counter() + time_limit_ms / 1000.0 if time_limit_ms else None
+
+    tally = Tally(len(players))
+    batch = min(_ADAPTIVE_FIRST.get(method, _ADAPTIVE_FIRST["mc"]), cap)
+    error = 0.0
+    while batch > 0:
+        run(batch, tally)
+        n = tally.trials
+        error = max(tally.half_width(i) for i in participating_idx)
+        if n == 0 or error <= target_error or n >= cap:
+            break
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        # Half-width shrinks as 1/sqrt(n): aim 10% past the estimate, at most doubling
+        needed = int(n * (error / target_error) ** 2 * 1.1) - n
+        batch = min(max(needed, n // 4, 1), n, cap - n)
+    return _seat_results(seats, folded_mask, expanded, participating_idx, tally), tally.trials, error
+
+
+# Exact heads-up: cap on runout classes x (combos + conflicting pairs), and the
+# row chunk bounding the size of each NumPy step
+_EXACT_TWO_MAX_WORK = 200_000_000
+_EXACT_TWO_CHUNK = 1 << 22
+
+
+def _combo_array(combos: List[Combo]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    cards = np.array(combos, dtype=np.intp).reshape(-1, 2)
+    keys, suit_masks = batch_keys(cards)
+    masks = np.array([CARD_BITS[a] | CARD_BITS[b] for a, b in combos], dtype=np.uint64)
+    return keys, suit_masks, masks
+
+
 def compute_equity_exact_two(
-    players: List[PlayerInput], board: List[tuple]
+    players: List[PlayerInput], board: List[Card]
 ) -> Tuple[bool, List[SeatEquity]]:
+    """
+    Exact heads-up equity on a flop, turn or river: every non-conflicting
+    combo pair against every runout, equally weighted.
+
+    Per runout each live combo of both ranges is ranked once (NumPy, all
+    runouts at once). Player 1's wins, ties and losses against the whole
+    opposing range come from a row-wise searchsorted over the sorted opposing
+    ranks; pairs that share a card are then subtracted from the counts they
+    were wrongly included in. Runouts are grouped by the suit permutations that
+    fix the board and both ranges, weighted by orbit size.
+    """
     # Only for 2 players
     if len(players) != 2:
         return False, []
@@ -159,78 +489,92 @@ def compute_equity_exact_two(
     if not combos1 or not combos2:
         return False, []
 
-    used_board = set(card_to_str(c) for c in board)
-    all_cards = full_deck()
-    deck_remaining = [c for c in all_cards if card_to_str(c) not in used_board]
-
+    used_board = mask_of(board)
+    deck_remaining = remove_cards(full_deck(), used_board)
     k = 5 - len(board)
-    # Feasibility heuristic
-    # Upper bound on pairings (worst-case no overlap)
-    # We'll cap at ~1.5M evaluations
-    from math import comb
-
-    est_pairs = len(combos1) * len(combos2)
-    est_boards = comb(len(deck_remaining), k) if k > 0 else 1
-    if est_pairs * est_boards > 1_500_000:
+    if not 0 <= k <= 2:
         return False, []
 
+    maps = fixing_ranges(board_stabilizer(board), [combos1, combos2])
+    classes = runout_classes(deck_remaining, k, maps)
+
+    # Conflicting pairs (share a card): card -> indexes of player 2's combos holding it
+    holders: Dict[int, List[int]] = {}
+    for j, (a, b) in enumerate(combos2):
+        holders.setdefault(a, []).append(j)
+        holders.setdefault(b, []).append(j)
+    pa: List[int] = []
+    pb: List[int] = []
+    for i, (a, b) in enumerate(combos1):
+        for j in set(holders.get(a, ())) | set(holders.get(b, ())):
+            pa.append(i)
+            pb.append(j)
+    pa_np = np.array(pa, dtype=np.intp)
+    pb_np = np.array(pb, dtype=np.intp)
+
+    n, m = len(combos1), len(combos2)
+    # Feasibility heuristic: runout classes x (combos + conflicting pairs)
+    if len(classes) * (n + m + len(pa)) > _EXACT_TWO_MAX_WORK:
+        return False, []
+
+    board_key, board_suits = batch_keys(np.array(board, dtype=np.intp))
+    keys1, suits1, masks1 = _combo_array(combos1)
+    keys2, suits2, masks2 = _combo_array(combos2)
+    safe_key, safe_suits = batch_keys(np.arange(7, dtype=np.intp))
+
     win1 = 0.0
     win2 = 0.0
     tie_w = 0.0
     total_w = 0.0
 
-    deck_str = [card_to_str(c) for c in deck_remaining]
-    deck_map = {card_to_str(c): c for c in deck_remaining}
+    rows = max(1, _EXACT_TWO_CHUNK // (n + m + len(pa)))
+    for start in range(0, len(classes), rows):
+        chunk = classes[start : start + rows]
+        t = len(chunk)
+        runouts = np.array([r for r, _ in chunk], dtype=np.intp).reshape(t, k)
+        weights = np.array([w for _, w in chunk], dtype=np.float64)
+        run_keys, run_suits = batch_keys(runouts)
+        run_keys += board_key
+        run_suits += board_suits
+        run_masks = np.zeros(t, dtype=np.uint64)
+        for col in range(k):
+            run_masks |= np.left_shift(np.uint64(1), runouts[:, col].astype(np.uint64))
 
-    # Enumerate
-    for c1a, c1b in combos1:
-        s1a, s1b = card_to_str(c1a), card_to_str(c1b)
-        for c2a, c2b in combos2:
-            s2a, s2b = card_to_str(c2a), card_to_str(c2b)
-            if s1a in (s2a, s2b) or s1b in (s2a, s2b):
-                continue
-            used = used_board | {s1a, s1b, s2a, s2b}
-            if k == 0:
-                r1 = rank7([c1a, c1b, *board])
-                r2 = rank7([c2a, c2b, *board])
-                total_w += 1.0
-                if r1 > r2:
-                    win1 += 1.0
-                elif r2 > r1:
-                    win2 += 1.0
-                else:
-                    tie_w += 1.0
-            elif k == 1:
-                for s in deck_str:
-                    if s in used:
-                        continue
-                    b = [*board, deck_map[s]]
-                    r1 = rank7([c1a, c1b, *b])
-                    r2 = rank7([c2a, c2b, *b])
-                    total_w += 1.0
-                    if r1 > r2:
-                        win1 += 1.0
-                    elif r2 > r1:
-                        win2 += 1.0
-                    else:
-                        tie_w += 1.0
-            else:  # k == 2
-                # choose two distinct cards from remaining
-                usable = [s for s in deck_str if s not in used]
-                for i in range(len(usable)):
-                    si = usable[i]
-                    for j in range(i + 1, len(usable)):
-                        sj = usable[j]
-                        b = [*board, deck_map[si], deck_map[sj]]
-                        r1 = rank7([c1a, c1b, *b])
-                        r2 = rank7([c2a, c2b, *b])
-                        total_w += 1.0
-                        if r1 > r2:
-                            win1 += 1.0
-                        elif r2 > r1:
-                            win2 += 1.0
-                        else:
-                            tie_w += 1.0
+        live1 = (run_masks[:, None] & masks1[None, :]) == 0
+        live2 = (run_masks[:, None] & masks2[None, :]) == 0
+        # Combos that hold a runout card would repeat it; rank a valid dummy hand instead
+        r1 = rank_batch_keys(
+            np.where(live1, run_keys[:, None] + keys1, safe_key), np.where(live1, run_suits[:, None] + suits1, safe_suits)
+        ).astype(np.int64)
+        r2 = rank_batch_keys(
+            np.where(live2, run_keys[:, None] + keys2, safe_key), np.where(live2, run_suits[:, None] + suits2, safe_suits)
+        ).astype(np.int64)
+        # Dead opposing combos rank 0, below every hand, and are removed from "lt"
+        r2[~live2] = 0
+        dead2 = m - live2.sum(axis=1)
+
+        offsets = (np.arange(t, dtype=np.int64) * 8192)[:, None]
+        flat = np.sort(r2 + offsets, axis=1).ravel()
+        lt = np.searchsorted(flat, (r1 + offsets).ravel(), side="left").reshape(t, n) - offsets // 8192 * m
+        le = np.searchsorted(flat, (r1 + offsets).ravel(), side="right").reshape(t, n) - offsets // 8192 * m
+        lt = lt - dead2[:, None]
+        eq = le - lt - dead2[:, None]
+        gt = m - le
+
+        w1 = (np.where(live1, lt, 0).sum(axis=1)).astype(np.float64)
+        wt = (np.where(live1, eq, 0).sum(axis=1)).astype(np.float64)
+        w2 = (np.where(live1, gt, 0).sum(axis=1)).astype(np.float64)
+        if pa:
+            both = live1[:, pa_np] & live2[:, pb_np]
+            ra = r1[:, pa_np]
+            rb = r2[:, pb_np]
+            w1 -= (both & (ra > rb)).sum(axis=1)
+            wt -= (both & (ra == rb)).sum(axis=1)
+            w2 -= (both & (ra < rb)).sum(axis=1)
+        win1 += float(w1 @ weights)
+        win2 += float(w2 @ weights)
+        tie_w += float(wt @ weights)
+    total_w = win1 + win2 + tie_w
 
     if total_w == 0:
         return False, []
@@ -245,3 +589,167 @@ def compute_equity_exact_two(
         SeatEquity(seat=seats[1], equity=eq2, tie=ti2, participating=True),
     ]
     return True, per_seat
+
+
+# Cost model for exact multiway enumeration, in microseconds on one core:
+# a search node (a partial combo tuple), one hand ranking, one MC trial.
+_EXACT_NODE_US = 6.0
+_RANK_US = 1.5
+_MC_TRIAL_US = {"mc": 30.0, "vectorized": 0.2}  # heads-up; scales with players
+# Exact is always taken when its estimate is below this, whatever MC would cost
+_EXACT_FLOOR_US = 200_000.0
+# Hard cap when exact is requested explicitly
+EXACT_MAX_US = 10_000_000.0
+
+
+def exact_multi_cost(combo_counts: List[int], board_len: int) -> float:
+    """
+    Estimated microseconds for compute_equity_exact_multi: per runout, every
+    combo is ranked once and every tuple over all but the largest range is a
+    search node. Card conflicts only prune, so this is an upper bound.
+    """
+    counts = sorted(combo_counts)
+    runouts = 52 - board_len if board_len == 4 else 1
+    nodes = 0
+    prefix = 1
+    for n in counts[:-1]:
+        prefix *= n
+        nodes += prefix
+    return runouts * (nodes * _EXACT_NODE_US + sum(counts) * _RANK_US)
+
+
+def mc_cost(n_players: int, iterations: int, method: str = "mc") -> float:
+    return iterations * _MC_TRIAL_US.get(method, _MC_TRIAL_US["mc"]) * n_players / 2
+
+
+def exact_budget(n_players: int, iterations: int, method: str = "mc") -> float:
+    """
+    Largest exact_multi_cost worth paying instead of running MC.
+    """
+    return max(_EXACT_FLOOR_US, mc_cost(n_players, iterations, method))
+
+
+def compute_equity_exact_multi(
+    players: List[PlayerInput], board: List[Card], max_cost_us: float | None = None
+) -> Tuple[bool, List[SeatEquity]]:
+    """
+    Exact equity for 2-6 players on a turn or river board: every
+    non-conflicting combo tuple against every runout, equally weighted.
+
+    Per runout each combo is ranked once. Tuples over all but the largest range
+    are enumerated depth-first with card-mask pruning; the last player is
+    counted in bulk from its sorted ranks with bisect, correcting for the few
+    combos blocked by the cards already dealt. Returns (False, []) when the
+    board is not a turn or river, or the cost estimate exceeds max_cost_us.
+    """
+    board = list(board)
+    if len(board) not in (4, 5):
+        return False, []
+    board_cards, seats, folded_mask, expanded, participating_idx = _prepare(players, board)
+    if len(participating_idx) < 2:
+        return True, _no_contest(seats, folded_mask)
+    if max_cost_us is not None and exact_multi_cost([len(expanded[i]) for i in participating_idx], len(board)) > max_cost_us:
+        return False, []
+
+    # Smallest ranges first: fewer nodes, and the largest is counted in bulk
+    order = sorted(participating_idx, key=lambda i: len(expanded[i]))
+    head, last = order[:-1], order[-1]
+    depth = len(head)
+    wins = [0.0] * len(players)
+    ties = [0.0] * len(players)
+    total = 0
+
+    board_mask = mask_of(board)
+    runouts = [[c] for c in remove_cards(full_deck(), board_mask)] if len(board) == 4 else [[]]
+    for runout in runouts:
+        full_board = board + runout
+        dead = board_mask | mask_of(runout)
+        ranked = {}
+        live: List[List[Tuple[int, int, int, int]]] = []  # per head player: (mask, rank, card, card)
+        for i in head:
+            rows = []
+            for a, b in expanded[i]:
+                m = CARD_BITS[a] | CARD_BITS[b]
+                if m & dead:
+                    continue
+                r = ranked.get(m)
+                if r is None:
+                    r = ranked[m] = rank7([a, b, *full_board])
+                rows.append((m, r, a, b))
+            live.append(rows)
+        # Last player: sorted ranks, plus each card's combos for blocker corrections
+        last_ranks: List[int] = []
+        by_card: Dict[int, List[int]] = {}
+        for a, b in expanded[last]:
+            m = CARD_BITS[a] | CARD_BITS[b]
+            if m & dead:
+                continue
+            r = ranked.get(m)
+            if r is None:
+                r = ranked[m] = rank7([a, b, *full_board])
+            j = len(last_ranks)
+            last_ranks.append(r)
+            by_card.setdefault(a, []).append(j)
+            by_card.setdefault(b, []).append(j)
+        sorted_ranks = sorted(last_ranks)
+        n_last = len(sorted_ranks)
+        if n_last == 0 or any(not rows for rows in live):
+            continue
+
+        def settle(cards: List[int], best: int, leaders: List[int]) -> None:
+            nonlocal total
+            blocked = set()
+            for c in cards:
+                blocked.update(by_card.get(c, ()))
+            lo = bisect_left(sorted_ranks, best)
+            hi = bisect_right(sorted_ranks, best)
+            n_lt, n_eq, n_gt = lo, hi - lo, n_last - hi
+            for j in blocked:
+                r = last_ranks[j]
+                if r < best:
+                    n_lt -= 1
+                elif r == best:
+                    n_eq -= 1
+                else:
+                    n_gt -= 1
+            total += n_lt + n_eq + n_gt
+            wins[last] += n_gt
+            if n_eq:
+                share = n_eq / (len(leaders) + 1)
+                wins[last] += share
+                ties[last] += share
+                for i in leaders:
+                    wins[i] += share
+                    ties[i] += share
+            if n_lt:
+                if len(leaders) == 1:
+                    wins[leaders[0]] += n_lt
+                else:
+                    share = n_lt / len(leaders)
+                    for i in leaders:
+                        wins[i] += share
+                        ties[i] += share
+
+        def descend(level: int, used: int, cards: List[int], best: int, leaders: List[int]) -> None:
+            i = head[level]
+            for m, r, a, b in live[level]:
+                if m & used:
+                    continue
+                if r > best:
+                    nb, nl = r, [i]
+                elif r == best:
+                    nb, nl = best, leaders + [i]
+                else:
+                    nb, nl = best, leaders
+                if level + 1 == depth:
+                    settle(cards + [a, b], nb, nl)
+                else:
+                    descend(level + 1, used | m, cards + [a, b], nb, nl)
+
+        descend(0, dead, [], -1, [])
+
+    if total == 0:
+        return False, []
+    tally = Tally(len(players))
+    tally.wins, tally.ties, tally.trials = wins, ties, total
+    return True, _seat_results(seats, folded_mask, expanded, participating_idx, tally, exact=True)
@@ -1,9 +1,16 @@
 from __future__ import annotations
-from typing import List, Tuple
+from typing import Dict, List, Sequence, Tuple
+from itertools import combinations, combinations_with_replacement
 import os
 
+import numpy as np
 
-Card = Tuple[int, str]
+from .deck import CARD_RANKS, CARD_SUITS, CARD_STRS
+from .tables import MAX_RANK_KEY, MULTISET_OFFSETS, NO_KEY, RANK_KEYS, load_tables
+
+
+Card = int
+RankSuit = Tuple[int, int]  # (rank 2..14, suit index) used by the pure evaluator
 
 _USE_PURE = os.environ.get("EQUITY_FORCE_PURE") == "1"
 _HAVE_EVAL7 = False
@@ -16,8 +23,8 @@ except Exception:
     _HAVE_EVAL7 = False
 
 
-def _rank5_pure(cards: List[Card]) -> Tuple[int, Tuple[int, ...]]:
-    # cards: 5 items (rank 2..14, suit)
+def _rank5_pure(cards: List[RankSuit]) -> Tuple[int, Tuple[int, ...]]:
+    # cards: 5 items (rank 2..14, suit index)
     ranks = sorted((c[0] for c in cards), reverse=True)
     suits = [c[1] for c in cards]
     # Rank counts
@@ -50,14 +57,14 @@ def _rank5_pure(cards: List[Card]) -> Tuple[int, Tuple[int, ...]]:
         if ct >= 5:
             flush_suit = s
             break
-    if flush_suit:
+    if flush_suit is not None:
         flush_ranks = sorted([c[0] for c in cards if c[1] == flush_suit], reverse=True)
     else:
         flush_ranks = []
 
     # Straight and straight flush detection
     has_straight, straight_high = is_straight(ranks)
-    if flush_suit:
+    if flush_suit is not None:
         has_sf, sf_high = is_straight([c for c in flush_ranks])
         if has_sf:
             return 8, (sf_high,)
@@ -78,7 +85,7 @@ def _rank5_pure(cards: List[Card]) -> Tuple[int, Tuple[int, ...]]:
         return 6, (trip, pair)
 
     # Flush
-    if flush_suit:
+    if flush_suit is not None:
         top5 = tuple(flush_ranks[:5])
         return 5, top5
 
@@ -108,7 +115,7 @@ def _rank5_pure(cards: List[Card]) -> Tuple[int, Tuple[int, ...]]:
     return 0, tuple(ranks[:5])
 
 
-def _best5_of7_pure(cards: List[Card]) -> Tuple[int, Tuple[int, ...]]:
+def _best5_of7_pure(cards: List[RankSuit]) -> Tuple[int, Tuple[int, ...]]:
     # choose best of all 21 5-card subsets
     from itertools import combinations
 
@@ -120,22 +127,162 @@ def _best5_of7_pure(cards: List[Card]) -> Tuple[int, Tuple[int, ...]]:
     return best
 
 
+def _rank7_brute(cards: List[Card]) -> int:
+    # Reference evaluator: best of the 21 subsets, legacy integer encoding
+    cat, tb = _best5_of7_pure([(CARD_RANKS[c], CARD_SUITS[c]) for c in cards])
+    # Encode into an int
+    # Base: category * 1e10 + tie-breakers spaced by 1e8,1e6,...
+    val = cat * 10_000_000_000
+    mul = 100_000_000
+    for x in tb:
+        val += x * mul
+        mul //= 100
+    return val
+
+
+# Per-suit card counts packed in 3-bit fields; _FLUSH_SUIT maps the packed
+# counts of 7 cards to the suit holding 5+ of them, or -1.
+_SUIT_KEY = [1 << (3 * (c & 3)) for c in range(52)]
+_FLUSH_SUIT = [-1] * (1 << 12)
+for _key in range(1 << 12):
+    for _s in range(4):
+        if (_key >> (3 * _s)) & 7 >= 5:
+            _FLUSH_SUIT[_key] = _s
+_O0, _O1, _O2, _O3, _O4, _O5, _O6 = MULTISET_OFFSETS
+_NOFLUSH: Sequence[int] = ()
+_FLUSH: Sequence[int] = ()
+if not _HAVE_EVAL7:
+    _NOFLUSH, _FLUSH, _ = load_tables()
+
+
+def _rank7_table(cards: List[Card]) -> int:
+    c0, c1, c2, c3, c4, c5, c6 = cards
+    fs = _FLUSH_SUIT[
+        _SUIT_KEY[c0] + _SUIT_KEY[c1] + _SUIT_KEY[c2] + _SUIT_KEY[c3]
+        + _SUIT_KEY[c4] + _SUIT_KEY[c5] + _SUIT_KEY[c6]
+    ]
+    if fs >= 0:
+        m = 0
+        for c in cards:
+            if c & 3 == fs:
+                m |= 1 << (c >> 2)
+        return _FLUSH[m]
+    r0, r1, r2, r3, r4, r5, r6 = sorted([c0 >> 2, c1 >> 2, c2 >> 2, c3 >> 2, c4 >> 2, c5 >> 2, c6 >> 2])
+    return _NOFLUSH[_O0[r0] + _O1[r1] + _O2[r2] + _O3[r3] + _O4[r4] + _O5[r5] + _O6[r6]]
+
+
+def _eval7_classes() -> Dict[int, int]:
+    """
+    Maps eval7 scores onto the dense class numbers of the lookup tables, so that
+    rank7 returns the same values whichever backend is active.
+    """
+    import eval7  # type: ignore
+
+    scores = set()
+    for ranks in combinations_with_replacement(range(13), 5):
+        if any(ranks.count(r) > 4 for r in set(ranks)):
+            continue
+        scores.add(eval7.evaluate([eval7.Card(CARD_STRS[r * 4 + i % 4]) for i, r in enumerate(ranks)]))
+    for ranks in combinations(range(13), 5):
+        scores.add(eval7.evaluate([eval7.Card(CARD_STRS[r * 4]) for r in ranks]))
+    if len(scores) != 7462:
+        raise RuntimeError(f"unexpected eval7 class count: {len(scores)}")
+    return {v: i + 1 for i, v in enumerate(sorted(scores))}
+
+
+_EVAL7_CLASS: Dict[int, int] = _eval7_classes() if _HAVE_EVAL7 else {}
+
+
 def rank7(cards: List[Card]) -> int:
     """
-    Returns a comparable int where higher means better hand.
+    Returns a comparable int where higher means better hand: the dense hand
+    class 1..7462, identical across backends and to rank7_batch.
+    Cards are 7 ids 0..51 (see deck.py).
     """
     if _HAVE_EVAL7:
         # Build eval7 cards and evaluate best 5-of-7 automatically
         import eval7  # type: ignore
-        ecards = [eval7.Card(f"{'23456789TJQKA'[c[0]-2]}{c[1]}") for c in cards]
-        return eval7.evaluate(ecards)
-    else:
-        cat, tb = _best5_of7_pure(cards)
-        # Encode into an int
-        # Base: category * 1e10 + tie-breakers spaced by 1e8,1e6,...
-        val = cat * 10_000_000_000
-        mul = 100_000_000
-        for x in tb:
-            val += x * mul
-            mul //= 100
-        return val
+        ecards = [eval7.Card(CARD_STRS[c]) for c in cards]
+        return _EVAL7_CLASS[eval7.evaluate(ecards)]
+    return _rank7_table(cards)
+
+
+# NumPy batch evaluation. Each card maps to an int64 key holding its additive
+# rank key (bits 0..22) plus a per-suit counter (3 bits per suit from bit 23),
+# and to a uint64 bit at 13 * suit + rank. Summing these over a hand yields the
+# rank-multiset key, the suit counts and the per-suit rank masks in one pass;
+# hands sharing a board can add the board's sums once.
+_SUIT_SHIFT = 23
+_KEY_MASK = (1 << _SUIT_SHIFT) - 1
+_BATCH_ROWS = 1 << 18
+_np_tables = None
+
+
+def _load_np_tables():
+    global _np_tables
+    if _np_tables is None:
+        noflush, flush, keys = load_tables()
+        noflush_np = np.asarray(noflush, dtype=np.uint16)
+        keys_np = np.asarray(keys, dtype=np.uint32)
+        valid = keys_np != NO_KEY
+        dense = np.zeros(MAX_RANK_KEY + 1, dtype=np.uint16)
+        dense[keys_np[valid]] = noflush_np[valid]
+        card_keys = np.array(
+            [RANK_KEYS[c >> 2] + (1 << (_SUIT_SHIFT + 3 * (c & 3))) for c in range(52)], dtype=np.int64
+        )
+        card_suit_masks = np.array([1 << (13 * (c & 3) + (c >> 2)) for c in range(52)], dtype=np.uint64)
+        _np_tables = (
+            dense,
+            np.asarray(flush, dtype=np.uint16),
+            np.array(_FLUSH_SUIT, dtype=np.int8),
+            card_keys,
+            card_suit_masks,
+        )
+    return _np_tables
+
+
+def batch_keys(cards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sums per-card (key, suit mask) over the last axis of an array of card ids.
+    Partial sums (e.g. a board) can be added to those of the hole cards.
+    """
+    _, _, _, card_keys, card_suit_masks = _load_np_tables()
+    cards = np.asarray(cards, dtype=np.intp)
+    if cards.shape[-1] == 0:
+        return np.zeros(cards.shape[:-1], dtype=np.int64), np.zeros(cards.shape[:-1], dtype=np.uint64)
+    # Column-wise adds: far cheaper than a reduction over a short last axis
+    keys = card_keys[cards[..., 0]]
+    suit_masks = card_suit_masks[cards[..., 0]]
+    for j in range(1, cards.shape[-1]):
+        keys += card_keys[cards[..., j]]
+        suit_masks += card_suit_masks[cards[..., j]]
+    return keys, suit_masks
+
+
+def rank_batch_keys(keys: np.ndarray, suit_masks: np.ndarray) -> np.ndarray:
+    """
+    Hand classes (uint16, same values as rank7) of 7-card hands given their
+    summed keys and suit masks from batch_keys.
+    """
+    dense, flush, flush_suit, _, _ = _load_np_tables()
+    out = dense[keys & _KEY_MASK]
+    fs = flush_suit[keys >> _SUIT_SHIFT]
+    hit = np.nonzero(fs >= 0)
+    if hit[0].size:
+        shift = fs[hit].astype(np.uint64) * np.uint64(13)
+        out[hit] = flush[(suit_masks[hit] >> shift) & np.uint64(0x1FFF)]
+    return out
+
+
+def rank7_batch(cards: np.ndarray) -> np.ndarray:
+    """
+    Vectorized rank7 over an (N, 7) array of card ids; returns N uint16 classes.
+    """
+    cards = np.asarray(cards)
+    if cards.ndim != 2 or cards.shape[1] != 7:
+        raise ValueError("cards must have shape (N, 7)")
+    out = np.empty(len(cards), dtype=np.uint16)
+    for start in range(0, len(cards), _BATCH_ROWS):
+        chunk = cards[start : start + _BATCH_ROWS]
+        out[start : start + len(chunk)] = rank_batch_keys(*batch_keys(chunk))
+    return out
@@ -0,0 +1,83 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Tuple
+from itertools import combinations, permutations
+
+from .deck import Card, Combo, make_combo, mask_of
+
+
+# Suit isomorphism. Relabelling suits maps a spot (board, hands, runout) to one
+# with identical equity, so exact enumeration only needs one representative
+# per orbit under the suit permutations that leave the board in place.
+#
+# A permutation is stored as its card map: CardMap[c] is the image of card id c.
+CardMap = List[Card]
+
+SUIT_PERMS: List[Tuple[int, ...]] = list(permutations(range(4)))  # identity first
+CARD_MAPS: List[CardMap] = [[(c & ~3) | p[c & 3] for c in range(52)] for p in SUIT_PERMS]
+
+
+def board_stabilizer(board: Iterable[Card]) -> List[CardMap]:
+    """
+    Card maps of the suit permutations that map the board onto itself (as a
+    set). Always contains the identity, first.
+    """
+    board = list(board)
+    target = mask_of(board)
+    return [m for m in CARD_MAPS if mask_of(m[c] for c in board) == target]
+
+
+def fixing_combos(maps: List[CardMap], combos: Iterable[Combo]) -> List[CardMap]:
+    """
+    The maps that send each of the given combos onto itself.
+    """
+    combos = list(combos)
+    return [m for m in maps if all(make_combo(m[a], m[b]) == (a, b) for a, b in combos)]
+
+
+def fixing_ranges(maps: List[CardMap], ranges: Iterable[List[Combo]]) -> List[CardMap]:
+    """
+    The maps under which each range (a list of combos) is invariant as a set.
+    """
+    sets = [set(r) for r in ranges]
+    return [m for m in maps if all({make_combo(m[a], m[b]) for a, b in r} == r for r in sets)]
+
+
+def canonical_pairs(
+    combos1: List[Combo], combos2: List[Combo], maps: List[CardMap]
+) -> List[Tuple[Combo, Combo, int]]:
+    """
+    Groups the non-conflicting (combo1, combo2) pairs into orbits under `maps`
+    (a board stabilizer). Returns (rep1, rep2, count) per orbit, where count is
+    how many of the given pairs fall into it.
+    """
+    counts: Dict[Tuple[Combo, Combo], int] = {}
+    if len(maps) == 1:
+        for a in combos1:
+            for b in combos2:
+                if a[0] not in b and a[1] not in b:
+                    counts[(a, b)] = 1
+    else:
+        for a in combos1:
+            images_a = [(m, make_combo(m[a[0]], m[a[1]])) for m in maps]
+            for b in combos2:
+                if a[0] in b or a[1] in b:
+                    continue
+                key = min((ia, make_combo(m[b[0]], m[b[1]])) for m, ia in images_a)
+                counts[key] = counts.get(key, 0) + 1
+    return [(a, b, n) for (a, b), n in counts.items()]
+
+
+def runout_classes(cards: List[Card], k: int, maps: List[CardMap]) -> List[Tuple[Tuple[Card, ...], int]]:
+    """
+    The k-card runouts drawn from `cards` grouped into orbits under `maps`
+    (which must fix the board and both hands). Returns (runout, orbit size).
+    """
+    runouts = list(combinations(cards, k))
+    if len(maps) == 1:
+        return [(r, 1) for r in runouts]
+    out: List[Tuple[Tuple[Card, ...], int]] = []
+    for r in runouts:
+        orbit = {tuple(sorted(m[c] for c in r)) for m in maps}
+        if min(orbit) == r:
+            out.append((r, len(orbit)))
+    return out
@@ -0,0 +1,92 @@
+from __future__ import annotations
+from typing import Iterable, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import os
+import threading
+
+import numpy as np
+
+from ..models import PlayerInput, SeatEquity
+from .deck import Card
+from .engines import Tally, mc_tally, tally_results
+
+
+# One persistent pool per process, grown on demand. Shards are plain function
+# calls, so any process may run any shard; results depend only on the seed and
+# the shard count.
+_POOL: ProcessPoolExecutor | None = None
+_POOL_SIZE = 0
+_POOL_LOCK = threading.Lock()
+
+
+def max_pool_workers() -> int:
+    return max(1, int(os.environ.get("EQUITY_WORKERS") or os.cpu_count() or 1))
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    global _POOL, _POOL_SIZE
+    size = min(workers, max_pool_workers())
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_SIZE < size:
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)
+            _POOL = ProcessPoolExecutor(max_workers=size)
+            _POOL_SIZE = size
+        return _POOL
+
+
+def shutdown_pool() -> None:
+    global _POOL, _POOL_SIZE
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True, cancel_futures=True)
+        _POOL = None
+        _POOL_SIZE = 0
+
+
+def shard_seeds(seed: int | None, shards: int) -> List[int]:
+    """
+    Independent 128-bit seeds for each shard, spawned from the request seed
+    (fresh OS entropy when seed is None).
+    """
+    children = np.random.SeedSequence(seed).spawn(shards)
+    return [int.from_bytes(c.generate_state(4, dtype=np.uint32).tobytes(), "little") for c in children]
+
+
+def shard_sizes(iterations: int, shards: int) -> List[int]:
+    return [iterations // shards + (1 if i < iterations % shards else 0) for i in range(shards)]
+
+
+def _run_shard(job: Tuple[List[PlayerInput], List[Card], int, int, str]) -> Tally:
+    players, board_cards, iterations, seed, method = job
+    return mc_tally(players, board_cards, iterations, seed=seed, method=method)
+
+
+def compute_equity_mc_parallel(
+    players: List[PlayerInput],
+    board: Iterable[Card] | None,
+    iterations: int = 30000,
+    seed: int | None = None,
+    workers: int = 1,
+    method: str = "mc",
+) -> Tuple[List[SeatEquity], int]:
+    """
+    Splits the iterations into `workers` shards, each with its own RNG stream
+    from shard_seeds, runs them on the process pool and merges the counts in
+    shard order. For a fixed seed and worker count the result is identical
+    from run to run. Returns (per_seat, trials).
+    """
+    board_cards = list(board or [])
+    jobs = [
+        (players, board_cards, n, s, method)
+        for n, s in zip(shard_sizes(iterations, workers), shard_seeds(seed, workers))
+        if n > 0
+    ]
+    if len(jobs) == 1:
+        tallies = [_run_shard(jobs[0])]
+    else:
+        tallies = list(get_pool(len(jobs)).map(_run_shard, jobs))
+    total = Tally(len(players))
+    for t in tallies:
+        total.merge(t)
+    return tally_results(players, board_cards, total), total.trials
@@ -0,0 +1,253 @@
+from __future__ import annotations
+from typing import List, Tuple
+from itertools import combinations
+from math import comb
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from ..models import PlayerInput, SeatEquity
+from .deck import CARD_BITS, COMBOS
+from .evaluator import batch_keys, rank_batch_keys
+from .isomorphism import CARD_MAPS
+from .ranges import COMBO_CLASSES, expand_range_text
+from .tables import table_dir
+
+
+# Exact heads-up preflop all-in equity, precomputed per pair of the 169 hand
+# classes. For classes A and B the file stores, summed over every
+# non-conflicting combo pair (a in A, b in B) and every 5-card board:
+#   WINS[A, B] - boards on which a beats b
+#   TIES[A, B] - boards on which they tie
+# Each pair sees C(48, 5) boards, so the totals divide by PAIRS[A, B] * C(48, 5).
+# A range made of whole classes is then an exact sum over the table.
+#
+# The table is built offline (python -m app.equity.preflop): every board is one
+# of ~134k suit-canonical boards, weighted by its orbit size, since class-pair
+# totals are invariant under suit permutations.
+
+PREFLOP_VERSION = 1
+PREFLOP_MAGIC = b"PKPF"
+PREFLOP_FILE = f"preflop_hu.v{PREFLOP_VERSION}.bin"
+N_CLASSES = 169
+BOARDS_PER_PAIR = comb(48, 5)
+
+_HEADER = struct.Struct("<4sII")
+
+
+def preflop_path() -> str:
+    return os.path.join(table_dir(), PREFLOP_FILE)
+
+
+def canonical_boards() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    One representative per suit-isomorphism class of 5-card boards, as
+    ((K, 5) sorted card ids, (K,) orbit sizes).
+    """
+    boards = np.array(list(combinations(range(52), 5)), dtype=np.int64)
+    best = None
+    for m in CARD_MAPS:
+        mapped = np.sort(np.asarray(m, dtype=np.int64)[boards], axis=1)
+        code = np.zeros(len(boards), dtype=np.int64)
+        for k in range(5):
+            code |= mapped[:, k] << (6 * k)
+        best = code if best is None else np.minimum(best, code)
+    codes, counts = np.unique(best, return_counts=True)
+    cards = np.stack([(codes >> (6 * k)) & 63 for k in range(5)], axis=1)
+    return cards, counts
+
+
+class _Layout:
+    """
+    Static index arrays for the accumulation: combos ordered by class, and
+    every unordered pair of distinct combos sharing a card.
+    """
+
+    def __init__(self):
+        order = np.argsort(np.array(COMBO_CLASSES), kind="stable")
+        self.combos = [COMBOS[i] for i in order]
+        self.cls = np.array(COMBO_CLASSES, dtype=np.int64)[order]
+        self.masks = np.array([CARD_BITS[a] | CARD_BITS[b] for a, b in self.combos], dtype=np.uint64)
+        self.keys, self.suit_masks = batch_keys(np.array(self.combos, dtype=np.intp))
+        self.safe_key, self.safe_suits = batch_keys(np.arange(7, dtype=np.intp))
+        holders: List[List[int]] = [[] for _ in range(52)]
+        for i, (a, b) in enumerate(self.combos):
+            holders[a].append(i)
+            holders[b].append(i)
+        pa = [i for h in holders for i in h for j in h if i < j]
+        pb = [j for h in holders for i in h for j in h if i < j]
+        self.pa = np.array(pa, dtype=np.intp)
+        self.pb = np.array(pb, dtype=np.intp)
+        self.cell_ab = self.cls[self.pa] * N_CLASSES + self.cls[self.pb]
+        self.cell_ba = self.cls[self.pb] * N_CLASSES + self.cls[self.pa]
+
+
+def accumulate(boards: np.ndarray, weights: np.ndarray, layout: _Layout | None = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (WINS, TIES) class-pair sums over the given boards, each counted `weight`
+    times. Per board every live combo is ranked once; class counts below and
+    level with each combo come from a cumulative class histogram in rank
+    order, and pairs sharing a card are subtracted afterwards.
+    """
+    lay = layout or _Layout()
+    wins = np.zeros((N_CLASSES, N_CLASSES), dtype=np.int64)
+    ties = np.zeros((N_CLASSES, N_CLASSES), dtype=np.int64)
+    cells = N_CLASSES * N_CLASSES
+    for board, weight in zip(boards.tolist(), weights.tolist()):
+        board_key, board_suits = batch_keys(np.array(board, dtype=np.intp))
+        board_mask = np.uint64(sum(CARD_BITS[c] for c in board))
+        live = (lay.masks & board_mask) == 0
+        ranks = rank_batch_keys(
+            np.where(live, lay.keys + board_key, lay.safe_key), np.where(live, lay.suit_masks + board_suits, lay.safe_suits)
+        ).astype(np.int32)
+
+        # Live combos stay in class order, so each class is a contiguous run
+        live_ranks = ranks[live]
+        live_cls = lay.cls[live]
+        order = np.argsort(live_ranks, kind="stable")
+        sorted_ranks = live_ranks[order]
+        hist = np.zeros((len(order) + 1, N_CLASSES), dtype=np.int32)
+        hist[np.arange(1, len(order) + 1), live_cls[order]] = 1
+        np.cumsum(hist, axis=0, out=hist)
+        lo = hist[np.searchsorted(sorted_ranks, live_ranks, side="left")]
+        hi = hist[np.searchsorted(sorted_ranks, live_ranks, side="right")]
+        sizes = np.bincount(live_cls, minlength=N_CLASSES)
+        bounds = np.minimum(np.searchsorted(live_cls, np.arange(N_CLASSES)), len(live_cls) - 1)
+        w_board = np.add.reduceat(lo, bounds, axis=0).astype(np.int64)
+        t_board = np.add.reduceat(hi - lo, bounds, axis=0).astype(np.int64)
+        # reduceat yields a stray row for classes with no live combo
+        w_board[sizes == 0] = 0
+        t_board[sizes == 0] = 0
+        # Each combo ties itself
+        t_board[np.arange(N_CLASSES), np.arange(N_CLASSES)] -= sizes
+
+        both = live[lay.pa] & live[lay.pb]
+        ra = ranks[lay.pa]
+        rb = ranks[lay.pb]
+        won = np.concatenate([lay.cell_ab[both & (ra > rb)], lay.cell_ba[both & (ra < rb)]])
+        tied = both & (ra == rb)
+        tied_cells = np.concatenate([lay.cell_ab[tied], lay.cell_ba[tied]])
+        w_board -= np.bincount(won, minlength=cells).reshape(N_CLASSES, N_CLASSES)
+        t_board -= np.bincount(tied_cells, minlength=cells).reshape(N_CLASSES, N_CLASSES)
+
+        wins += weight * w_board
+        ties += weight * t_board
+    return wins, ties
+
+
+def pair_counts() -> np.ndarray:
+    """
+    Non-conflicting combo pairs per class pair.
+    """
+    masks = np.array([CARD_BITS[a] | CARD_BITS[b] for a, b in COMBOS], dtype=np.uint64)
+    onehot = np.zeros((len(COMBOS), N_CLASSES))
+    onehot[np.arange(len(COMBOS)), COMBO_CLASSES] = 1.0
+    free = ((masks[:, None] & masks[None, :]) == 0).astype(np.float64)
+    return onehot.T @ free @ onehot
+
+
+def build_preflop_table(progress: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    boards, weights = canonical_boards()
+    layout = _Layout()
+    wins = np.zeros((N_CLASSES, N_CLASSES), dtype=np.int64)
+    ties = np.zeros((N_CLASSES, N_CLASSES), dtype=np.int64)
+    step = 4096
+    for start in range(0, len(boards), step):
+        w, t = accumulate(boards[start : start + step], weights[start : start + step], layout)
+        wins += w
+        ties += t
+        if progress:
+            print(f"{min(start + step, len(boards))}/{len(boards)} boards", flush=True)
+    return wins, ties
+
+
+def write_preflop_table(path: str, wins: np.ndarray, ties: np.ndarray) -> None:
+    if wins.max() >= 1 << 32 or ties.max() >= 1 << 32 or min(wins.min(), ties.min()) < 0:
+        raise ValueError("preflop table counts out of range")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(PREFLOP_MAGIC, PREFLOP_VERSION, N_CLASSES))
+        f.write(wins.astype("<u4").tobytes())
+        f.write(ties.astype("<u4").tobytes())
+    os.replace(tmp, path)
+
+
+_TABLE = None
+
+
+def load_preflop_table():
+    """
+    Returns (WINS, TIES, PAIRS) as 169x169 arrays, with WINS and TIES
+    memory-mapped from the table file, or None if it has not been built.
+    """
+    global _TABLE
+    if _TABLE is not None:
+        return _TABLE
+    path = preflop_path()
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    magic, version, n = _HEADER.unpack_from(mm, 0)
+    size = N_CLASSES * N_CLASSES * 4
+    if magic != PREFLOP_MAGIC or version != PREFLOP_VERSION or n != N_CLASSES or len(mm) != _HEADER.size + 2 * size:
+        mm.close()
+        return None
+    wins = np.frombuffer(mm, dtype="<u4", count=N_CLASSES * N_CLASSES, offset=_HEADER.size).reshape(N_CLASSES, N_CLASSES)
+    ties = np.frombuffer(mm, dtype="<u4", count=N_CLASSES * N_CLASSES, offset=_HEADER.size + size).reshape(
+        N_CLASSES, N_CLASSES
+    )
+    _TABLE = (wins, ties, pair_counts())
+    return _TABLE
+
+
+def _class_weights(text: str) -> np.ndarray | None:
+    # 1.0 per fully included class; None if the range splits a class
+    combos, _ = expand_range_text(text)
+    counts = np.bincount([_COMBO_CLASS[c] for c in combos], minlength=N_CLASSES)
+    sizes = np.bincount(COMBO_CLASSES, minlength=N_CLASSES)
+    if np.any((counts > 0) & (counts < sizes)):
+        return None
+    return (counts > 0).astype(np.float64)
+
+
+_COMBO_CLASS = {c: k for c, k in zip(COMBOS, COMBO_CLASSES)}
+
+
+def compute_equity_preflop_table(players: List[PlayerInput]) -> Tuple[bool, List[SeatEquity]]:
+    """
+    Exact heads-up preflop equity from the precomputed class table. Returns
+    (False, []) when the table is missing, the spot is not heads-up or a
+    range covers only part of a hand class.
+    """
+    if len(players) != 2 or players[0].folded or players[1].folded:
+        return False, []
+    table = load_preflop_table()
+    if table is None:
+        return False, []
+    wins, ties, pairs = table
+    x = _class_weights(players[0].range.text)
+    y = _class_weights(players[1].range.text)
+    if x is None or y is None:
+        return False, []
+    total = float(x @ pairs @ y) * BOARDS_PER_PAIR
+    if total == 0:
+        return False, []
+    w1 = float(x @ wins @ y)
+    w2 = float(y @ wins @ x)
+    tie = float(x @ ties @ y)
+    per_seat = [
+        SeatEquity(seat=players[0].seat, equity=(w1 + tie * 0.5) / total * 100.0, tie=tie * 0.5 / total * 100.0, participating=True),
+        SeatEquity(seat=players[1].seat, equity=(w2 + tie * 0.5) / total * 100.0, tie=tie * 0.5 / total * 100.0, participating=True),
+    ]
+    return True, per_seat
+
+
+if __name__ == "__main__":
+    path = preflop_path()
+    write_preflop_table(path, *build_preflop_table(progress=True))
+    print(f"wrote {path}")
@@ -1,17 +1,51 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple, Set, Iterable
+from typing import Dict, List, NamedTuple, Tuple, Set, Iterable
+from functools import lru_cache
 import re
-from .deck import RANK_ORDER, rank_to_value, value_to_rank, SUITS, make_card, card_to_str, parse_card
 
-
-Card = Tuple[int, str]
-Combo = Tuple[Card, Card]
+import numpy as np
+
+from .deck import (
+    RANK_ORDER,
+    rank_to_value,
+    value_to_rank,
+    SUITS,
+    CARD_BITS,
+    CARD_RANKS,
+    CARD_COMBO_MASKS,
+    COMBOS,
+    COMBO_INDEX,
+    Card,
+    Combo,
+    make_card,
+    make_combo,
+    parse_card,
+)
 
 
 RANKS_DESC = list(reversed(list(RANK_ORDER)))  # A..2
 IDX = {r: i for i, r in enumerate(RANKS_DESC)}
 
 
+# The 169 starting-hand classes on the 13x13 grid (A..2 on both axes): pairs on
+# the diagonal, suited above it, offsuit below. Class index = row * 13 + col.
+def hand_class(combo: Combo) -> int:
+    hi, lo = combo
+    i = 14 - CARD_RANKS[hi]
+    j = 14 - CARD_RANKS[lo]
+    if i == j or hi % 4 == lo % 4:
+        return i * 13 + j
+    return j * 13 + i
+
+
+HAND_CLASSES: List[str] = [
+    RANKS_DESC[min(i, j)] + RANKS_DESC[max(i, j)] + ("" if i == j else "s" if i < j else "o")
+    for i in range(13)
+    for j in range(13)
+]
+COMBO_CLASSES: List[int] = [hand_class(c) for c in COMBOS]
+
+
 def _pair_combos(rank_char: str) -> List[Tuple[Card, Card]]:
     r = rank_char
     suits = list(SUITS)
@@ -168,50 +202,90 @@ def _gen_from_kind(kind: str, hi: str, lo: str) -> List[Tuple[Card, Card]]:
     return _both_suits(hi, lo)
 
 
-def expand_range_text(text: str, board: Iterable[str] | Iterable[Card] | None = None) -> Tuple[List[Combo], List[str]]:
+# Compiled ranges: a 1326-bit int over COMBOS indexes. Compilation is memoized
+# per token and per canonical token list, so standard ranges are parsed once.
+_RANGE_CACHE_SIZE = 1024
+_TOKEN_CACHE_SIZE = 4096
+_SPLIT = re.compile(r",|\s+")
+
+
+class CompiledRange(NamedTuple):
+    mask: int  # bit i set: COMBOS[i] is in the range
+    errors: Tuple[str, ...]
+
+
+def range_tokens(text: str) -> Tuple[str, ...]:
     """
-    Parses the range text and returns a list of combos (c1, c2).
-    Applies blocker filtering against board cards if provided.
-    Rejects any token containing ':' (weights).
+    The canonical token list of a range text: separators and blanks dropped.
+    Raises ValueError on weighted tokens.
     """
+    tokens = tuple(t for t in _SPLIT.split(text or "") if t)
+    if any(":" in t for t in tokens):
+        raise ValueError("weights not supported")
+    return tokens
+
+
+@lru_cache(maxsize=_TOKEN_CACHE_SIZE)
+def _token_mask(token: str) -> int | None:
+    parts = _expand_token(token)
+    if not parts:
+        return None
+    mask = 0
+    for kind, hi, lo in parts:
+        for c1, c2 in _gen_from_kind(kind, hi, lo):
+            if c1 != c2:
+                mask |= 1 << COMBO_INDEX[make_combo(c1, c2)]
+    return mask
+
+
+@lru_cache(maxsize=_RANGE_CACHE_SIZE)
+def _compile_tokens(tokens: Tuple[str, ...]) -> CompiledRange:
+    mask = 0
     errors: List[str] = []
-    dead: Set[str] = set()
-    if board:
-        for b in board:
-            if isinstance(b, tuple):
-                dead.add(card_to_str(b))
-            else:
-                dead.add(card_to_str(parse_card(b)))
-
-    seen: Set[Tuple[str, str]] = set()
-
-    tokens = [t.strip() for t in re.split(r",|\s+", text) if t.strip()]
     for t in tokens:
-        if ":" in t:
-            raise ValueError("weights not supported")
-        parts = _expand_token(t)
-        if not parts:
+        m = _token_mask(t)
+        if m is None:
             errors.append(f"Unrecognized token: {t}")
-            continue
-        for kind, hi, lo in parts:
-            for c1, c2 in _gen_from_kind(kind, hi, lo):
-                s1, s2 = card_to_str(c1), card_to_str(c2)
-                if s1 in dead or s2 in dead:
-                    continue
-                if s1 == s2:
-                    continue
-                key = (s1, s2) if s1 < s2 else (s2, s1)
-                seen.add(key)
-
-    combos: List[Combo] = []
-    for (s1, s2) in seen:
-        c1 = parse_card(s1)
-        c2 = parse_card(s2)
-        combos.append((c1, c2))
-
-    # Sort for deterministic order
-    combos.sort(key=lambda x: (x[0][0] + x[1][0], x[0][1], x[1][1]))
-    return combos, errors
+        else:
+            mask |= m
+    return CompiledRange(mask, tuple(errors))
+
+
+@lru_cache(maxsize=_RANGE_CACHE_SIZE)
+def compile_range(text: str) -> CompiledRange:
+    """
+    Compiled combo mask of a range text (memoized on the raw text, then on
+    its canonical tokens).
+    """
+    return _compile_tokens(range_tokens(text))
+
+
+def blocked_mask(board: Iterable[str] | Iterable[Card] | None) -> int:
+    """
+    Combo mask of every combo holding one of the board cards.
+    """
+    dead = 0
+    for b in board or ():
+        dead |= CARD_COMBO_MASKS[b if isinstance(b, int) else parse_card(b)]
+    return dead
+
+
+def combos_of_mask(mask: int) -> List[Combo]:
+    # Set bits in ascending index order; COMBOS is sorted, so the result is too
+    if not mask:
+        return []
+    bits = np.unpackbits(np.frombuffer(mask.to_bytes(166, "little"), dtype=np.uint8), bitorder="little")
+    return [COMBOS[i] for i in np.flatnonzero(bits).tolist()]
+
+
+def expand_range_text(text: str, board: Iterable[str] | Iterable[Card] | None = None) -> Tuple[List[Combo], List[str]]:
+    """
+    Parses the range text and returns a list of combos (hi, lo) as card ids.
+    Applies blocker filtering against board cards if provided.
+    Rejects any token containing ':' (weights).
+    """
+    compiled = compile_range(text)
+    return combos_of_mask(compiled.mask & ~blocked_mask(board)), list(compiled.errors)
 
 
 def matrix_from_range_text(text: str) -> Tuple[List[List[float]], List[str]]:
@@ -224,8 +298,8 @@ def matrix_from_range_text(text: str) -> Tuple[List[List[float]], List[str]]:
     except ValueError as e:
         return mat, [str(e)]
     for c1, c2 in combos:
-        r1 = value_to_rank[c1[0]]
-        r2 = value_to_rank[c2[0]]
+        r1 = value_to_rank[CARD_RANKS[c1]]
+        r2 = value_to_rank[CARD_RANKS[c2]]
         i = IDX[r1]
         j = IDX[r2]
         if i == j:
@@ -0,0 +1,85 @@
+from __future__ import annotations
+from typing import Dict, List
+import random
+
+from .deck import CARD_BITS, Combo, cards_of
+
+
+# Rejection attempts before falling back to enumerating the available combos
+_MAX_TRIES = 16
+
+
+class ComboSampler:
+    """
+    Draws a uniformly random combo from one player's range that is not blocked
+    by a mask of used cards. Built once per request.
+
+    Draws are rejection samples against the precomputed combo masks, which is
+    O(1) expected while most of the range is live. After _MAX_TRIES misses the
+    sampler builds the availability bitset from the card -> combo inverted
+    index and picks uniformly among its set bits. Both paths are uniform over
+    the unblocked combos.
+    """
+
+    __slots__ = ("combos", "masks", "card_index", "all_bits", "rng", "draws", "attempts", "fallbacks", "empty")
+
+    def __init__(self, combos: List[Combo], rng: random.Random):
+        self.combos = combos
+        self.masks = [CARD_BITS[a] | CARD_BITS[b] for a, b in combos]
+        # card id -> bitset over indexes of the combos holding that card
+        self.card_index = [0] * 52
+        for i, (a, b) in enumerate(combos):
+            self.card_index[a] |= 1 << i
+            self.card_index[b] |= 1 << i
+        self.all_bits = (1 << len(combos)) - 1
+        self.rng = rng
+        self.draws = 0
+        self.attempts = 0
+        self.fallbacks = 0
+        self.empty = 0
+
+    def available(self, used: int) -> int:
+        """
+        Bitset over combo indexes not blocked by the used-card mask.
+        """
+        avail = self.all_bits
+        for c in cards_of(used):
+            avail &= ~self.card_index[c]
+        return avail
+
+    def sample(self, used: int) -> int:
+        """
+        Index of a uniformly drawn unblocked combo, or -1 if all are blocked.
+        """
+        masks = self.masks
+        n = len(masks)
+        rand = self.rng.random
+        self.draws += 1
+        if not n:
+            self.empty += 1
+            return -1
+        for t in range(_MAX_TRIES):
+            i = int(rand() * n)
+            if not masks[i] & used:
+                self.attempts += t + 1
+                return i
+        self.attempts += _MAX_TRIES
+        self.fallbacks += 1
+        avail = self.available(used)
+        count = avail.bit_count()
+        if not count:
+            self.empty += 1
+            return -1
+        for _ in range(int(rand() * count)):
+            avail &= avail - 1
+        return (avail & -avail).bit_length() - 1
+
+    def stats(self) -> Dict[str, float]:
+        accepted = self.draws - self.fallbacks
+        return {
+            "combos": len(self.masks),
+            "draws": self.draws,
+            "attempts": self.attempts,
+            "fallbacks": self.fallbacks,
+            "acceptance": (accepted / self.attempts) if self.attempts else 1.0,
+        }
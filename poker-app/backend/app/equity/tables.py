@@ -0,0 +1,156 @@
+from __future__ import annotations
+from typing import Dict, List, Tuple
+from itertools import combinations, combinations_with_replacement
+from math import comb
+import mmap
+import os
+import struct
+
+
+# Lookup tables for the pure-Python 7-card evaluator.
+#
+# Hand strength is a dense class number 1..7462 (higher is better) following the
+# ordering of evaluator._rank5_pure. A 7-card hand is scored with two tables:
+#   FLUSH[m]   - m is the 13-bit rank mask of a suit holding 5+ cards
+#   NOFLUSH[i] - i is the colex index of the sorted 7 ranks as a multiset,
+#                i = sum(C(r_k + k, k + 1)) for ascending ranks r_0..r_6
+# With 7 cards a flush excludes quads and full houses, so the flush table alone
+# decides any hand that contains one.
+#
+# The file also stores, per colex index, the additive rank key sum(RANK_KEYS[r]);
+# the NumPy batch evaluator scatters NOFLUSH into a dense key-indexed array so a
+# hand is scored from per-card key sums without sorting.
+
+TABLE_VERSION = 2
+TABLE_MAGIC = b"PKHT"
+TABLE_FILE = f"hand_ranks.v{TABLE_VERSION}.bin"
+
+N_NOFLUSH = comb(13 + 7 - 1, 7)  # multisets of 7 ranks
+N_FLUSH = 1 << 13
+
+# Additive rank keys: sums over any 7-card rank multiset are unique.
+RANK_KEYS = [0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181]
+MAX_RANK_KEY = 4 * RANK_KEYS[12] + 3 * RANK_KEYS[11]
+NO_KEY = 0xFFFFFFFF  # colex slots of impossible multisets (a rank 5+ times)
+
+_HEADER = struct.Struct("<4sIII")
+
+# MULTISET_OFFSETS[k][r] = C(r + k, k + 1): contribution of the k-th smallest rank.
+MULTISET_OFFSETS: List[List[int]] = [[comb(r + k, k + 1) for r in range(13)] for k in range(7)]
+
+
+def table_dir() -> str:
+    return os.environ.get("EQUITY_TABLE_DIR") or os.path.join(os.path.dirname(__file__), "data")
+
+
+def table_path() -> str:
+    return os.path.join(table_dir(), TABLE_FILE)
+
+
+def multiset_index(ranks: List[int]) -> int:
+    # ranks: 7 rank indexes 0..12
+    idx = 0
+    for k, r in enumerate(sorted(ranks)):
+        idx += MULTISET_OFFSETS[k][r]
+    return idx
+
+
+def _five_card_classes() -> Tuple[Dict[Tuple[int, ...], int], Dict[int, int]]:
+    """
+    Dense class numbers for every 5-card hand: non-flush hands keyed by sorted
+    rank indexes, flushes keyed by 13-bit rank mask.
+    """
+    from .evaluator import _rank5_pure
+
+    scores: Dict[Tuple[int, ...], tuple] = {}
+    for ranks in combinations_with_replacement(range(13), 5):
+        if any(ranks.count(r) > 4 for r in set(ranks)):
+            continue
+        # Cycle suits so equal ranks differ and no five share a suit
+        cards = [(r + 2, i % 4) for i, r in enumerate(ranks)]
+        scores[ranks] = _rank5_pure(cards)
+    flush_scores: Dict[int, tuple] = {}
+    for ranks in combinations(range(13), 5):
+        mask = sum(1 << r for r in ranks)
+        flush_scores[mask] = _rank5_pure([(r + 2, 0) for r in ranks])
+
+    dense = {s: i + 1 for i, s in enumerate(sorted(set(scores.values()) | set(flush_scores.values())))}
+    return (
+        {k: dense[s] for k, s in scores.items()},
+        {k: dense[s] for k, s in flush_scores.items()},
+    )
+
+
+def build_tables() -> Tuple[List[int], List[int], List[int]]:
+    five, five_flush = _five_card_classes()
+
+    noflush = [0] * N_NOFLUSH
+    keys = [NO_KEY] * N_NOFLUSH
+    for ranks in combinations_with_replacement(range(13), 7):
+        if any(ranks.count(r) > 4 for r in set(ranks)):
+            continue
+        idx = multiset_index(list(ranks))
+        noflush[idx] = max(five[sub] for sub in combinations(ranks, 5))
+        keys[idx] = sum(RANK_KEYS[r] for r in ranks)
+
+    flush = [0] * N_FLUSH
+    for n in (5, 6, 7):
+        for ranks in combinations(range(13), n):
+            mask = sum(1 << r for r in ranks)
+            flush[mask] = max(five_flush[sum(1 << r for r in sub)] for sub in combinations(ranks, 5))
+    return noflush, flush, keys
+
+
+def write_tables(path: str, noflush: List[int], flush: List[int], keys: List[int]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(TABLE_MAGIC, TABLE_VERSION, len(noflush), len(flush)))
+        f.write(struct.pack(f"<{len(noflush)}H", *noflush))
+        f.write(struct.pack(f"<{len(flush)}H", *flush))
+        f.write(struct.pack(f"<{len(keys)}I", *keys))
+    os.replace(tmp, path)
+
+
+def _map_tables(path: str):
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, n_noflush, n_flush = _HEADER.unpack_from(mm, 0)
+    if magic != TABLE_MAGIC or version != TABLE_VERSION or n_noflush != N_NOFLUSH or n_flush != N_FLUSH:
+        mm.close()
+        raise ValueError(f"stale or foreign table file: {path}")
+    end = _HEADER.size + 2 * (n_noflush + n_flush)
+    if len(mm) != end + 4 * n_noflush:
+        mm.close()
+        raise ValueError(f"truncated table file: {path}")
+    view = memoryview(mm)
+    u16 = view[_HEADER.size : end].cast("H")
+    return u16[:n_noflush], u16[n_noflush:], view[end:].cast("I")
+
+
+_TABLES = None
+
+
+def load_tables():
+    """
+    Returns (NOFLUSH, FLUSH, KEYS): the uint16 class tables and the uint32 rank
+    key of each NOFLUSH slot. The tables are memory-mapped from the versioned
+    table file, which is built and written on first use. Falls back to
+    in-memory lists when the table directory is read-only.
+    """
+    global _TABLES
+    if _TABLES is not None:
+        return _TABLES
+    path = table_path()
+    try:
+        _TABLES = _map_tables(path)
+        return _TABLES
+    except (OSError, ValueError):
+        pass
+    tables = build_tables()
+    try:
+        write_tables(path, *tables)
+        _TABLES = _map_tables(path)
+    except OSError:
+        _TABLES = tables
+    return _TABLES
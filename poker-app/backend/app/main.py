@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from .models import (
@@ -8,13 +10,33 @@ from .models import (
     ExpandResponse,
     ParseRangeRequest,
     ParseRangeResponse,
+    CacheStats,
 )
+from .dispatch import DEFAULT_DEADLINE_MS, JOB_POOL, DeadlineExceeded, Overloaded
+from .equity.cache import RESULT_CACHE, pack_result, result_key, unpack_result
 from .equity.deck import parse_board, parse_card, card_to_str
 from .equity.ranges import expand_range_text, matrix_from_range_text
-from .equity.engines import compute_equity_mc, compute_equity_exact_two
+from .equity.engines import (
+    compute_equity_adaptive,
+    compute_equity_mc,
+    compute_equity_mc_vectorized,
+    compute_equity_exact_two,
+    compute_equity_exact_multi,
+    exact_budget,
+    EXACT_MAX_US,
+)
+from .equity.parallel import compute_equity_mc_parallel, shutdown_pool
+from .equity.preflop import compute_equity_preflop_table
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    JOB_POOL.shutdown()
+    shutdown_pool()
 
-app = FastAPI(title="Range vs Range Equity API", version="0.1.0")
+
+app = FastAPI(title="Range vs Range Equity API", version="0.1.0", lifespan=lifespan)
 
 origins = ["http://localhost:3000", "http://127.0.0.1:3000"]
 app.add_middleware(
@@ -27,36 +49,115 @@ app.add_middleware(
 
 
 def _choose_method(req: EquityRequest, n_players: int, board_len: int | None) -> str:
-    if req.method == "mc":
-        return "mc"
+    if req.method in ("mc", "vectorized"):
+        return req.method
     if req.method == "exact":
         # Only exact for 2 players postflop when feasible
         return "exact"
-    # auto
-    if n_players == 2 and (board_len or 0) >= 4:
+    # auto: heads-up exact on any postflop board; multiway on turn and river,
+    # subject to the cost model
+    if n_players == 2 and (board_len or 0) >= 3:
+        return "exact"
+    if n_players > 2 and (board_len or 0) >= 4:
         return "exact"
     return "mc"
 
 
+def _max_ci(per_seat: list) -> float | None:
+    cis = [s.ci for s in per_seat if s.ci is not None]
+    return max(cis) if cis else None
+
+
+def _run_mc(req: EquityRequest, board: list, iters: int, method: str) -> EquityResult:
+    try:
+        if req.targetError is not None:
+            # Adaptive runs in-process; iterations is ignored in favour of maxIterations
+            per_seat, trials, error = compute_equity_adaptive(
+                req.players,
+                board=board,
+                target_error=req.targetError,
+                max_iterations=req.maxIterations,
+                time_limit_ms=req.timeLimitMs,
+                seed=req.seed,
+                method=method,
+            )
+            return EquityResult(perSeat=per_seat, method=method, iterations=trials, error=error)
+        if req.workers and req.workers > 1:
+            per_seat, trials = compute_equity_mc_parallel(
+                req.players, board=board, iterations=iters, seed=req.seed, workers=req.workers, method=method
+            )
+            return EquityResult(
+                perSeat=per_seat,
+                method=method,
+                iterations=iters if method == "mc" else trials,
+                error=_max_ci(per_seat),
+            )
+        if method == "vectorized":
+            per_seat, trials = compute_equity_mc_vectorized(req.players, board=board, iterations=iters, seed=req.seed)
+            return EquityResult(perSeat=per_seat, method="vectorized", iterations=trials, error=_max_ci(per_seat))
+        per_seat = compute_equity_mc(req.players, board=board, iterations=iters, seed=req.seed)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="weights are not supported")
+    return EquityResult(perSeat=per_seat, method="mc", iterations=iters, error=_max_ci(per_seat))
+
+
+async def _dispatch(req: EquityRequest, fn, *args) -> EquityResult:
+    # Equity work runs on the job pool; the event loop only waits for it
+    timeout = (req.deadlineMs or DEFAULT_DEADLINE_MS) / 1000.0
+    try:
+        return await JOB_POOL.run(fn, *args, timeout=timeout)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503, detail="equity workers are busy", headers={"Retry-After": str(e.retry_after)}
+        )
+    except DeadlineExceeded:
+        raise HTTPException(status_code=504, detail="deadline exceeded")
+
+
+async def _cached(kind: str, req: EquityRequest, board: list, fn, *args) -> EquityResult:
+    # Identical and suit-isomorphic questions are answered from the result cache
+    key = result_key(kind, req, board)
+    if key is not None:
+        hit = RESULT_CACHE.get(key)
+        if hit is not None:
+            return unpack_result(hit, req.players)
+    result = await _dispatch(req, fn, *args)
+    if key is not None:
+        RESULT_CACHE.put(key, pack_result(result))
+    return result
+
+
 @app.post("/equity/preflop", response_model=EquityResult)
-def equity_preflop(req: EquityRequest) -> EquityResult:
-    # Preflop runs MC; if user asked exact, fall back to MC.
+async def equity_preflop(req: EquityRequest) -> EquityResult:
+    return await _cached("preflop", req, [], _equity_preflop, req)
+
+
+def _equity_preflop(req: EquityRequest) -> EquityResult:
+    # Heads-up preflop is exact from the precomputed class table when it has been
+    # built; otherwise (and multiway) preflop runs MC.
     iters = req.iterations or 20000
     method = _choose_method(req, n_players=len(req.players), board_len=0)
+    if req.method in ("auto", "exact") and len(req.players) == 2:
+        try:
+            ok, per_seat = compute_equity_preflop_table(req.players)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="weights are not supported")
+        if ok:
+            return EquityResult(perSeat=per_seat, method="exact")
     if method == "exact":
         method = "mc"
-    try:
-        per_seat = compute_equity_mc(req.players, board=[], iterations=iters, seed=req.seed)
-    except ValueError:
-        raise HTTPException(status_code=422, detail="weights are not supported")
-    return EquityResult(perSeat=per_seat, method="mc", iterations=iters)
+    return _run_mc(req, [], iters, method)
 
 
 @app.post("/equity/postflop", response_model=EquityResult)
-def equity_postflop(req: EquityRequest) -> EquityResult:
+async def equity_postflop(req: EquityRequest) -> EquityResult:
     if not req.board or not (3 <= len(req.board) <= 5):
         raise HTTPException(status_code=400, detail="board must have 3 to 5 cards")
     board = parse_board(req.board)
+    return await _cached("postflop", req, board, _equity_postflop, req, board)
+
+
+def _equity_postflop(req: EquityRequest, board: list) -> EquityResult:
     method = _choose_method(req, n_players=len(req.players), board_len=len(board))
     if method == "exact" and len(req.players) == 2:
         try:
@@ -66,13 +167,24 @@ def equity_postflop(req: EquityRequest) -> EquityResult:
         if ok:
             return EquityResult(perSeat=per_seat, method="exact")
         # fall back
-        method = "mc"
     iters = req.iterations or 30000
-    try:
-        per_seat = compute_equity_mc(req.players, board=board, iterations=iters, seed=req.seed)
-    except ValueError:
-        raise HTTPException(status_code=422, detail="weights are not supported")
-    return EquityResult(perSeat=per_seat, method="mc", iterations=iters)
+    if method == "exact" and len(req.players) > 2 and len(board) >= 4:
+        # Multiway: auto only goes exact when it is estimated cheaper than MC
+        budget = EXACT_MAX_US if req.method == "exact" else exact_budget(sum(not p.folded for p in req.players), iters)
+        try:
+            ok, per_seat = compute_equity_exact_multi(req.players, board, max_cost_us=budget)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="weights are not supported")
+        if ok:
+            return EquityResult(perSeat=per_seat, method="exact")
+    if method == "exact":
+        method = "mc"
+    return _run_mc(req, board, iters, method)
+
+
+@app.get("/cache/stats", response_model=CacheStats)
+def cache_stats() -> CacheStats:
+    return CacheStats(**RESULT_CACHE.stats())
 
 
 @app.post("/range/expand", response_model=ExpandResponse)
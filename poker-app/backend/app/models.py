@@ -3,7 +3,7 @@ from pydantic import BaseModel, Field
 
 
 SeatName = Literal["UTG", "HJ", "CO", "BTN", "SB", "BB"]
-MethodName = Literal["auto", "exact", "mc"]
+MethodName = Literal["auto", "exact", "mc", "vectorized"]
 
 
 class RangeSpec(BaseModel):
@@ -25,6 +25,15 @@ class EquityRequest(BaseModel):
     method: MethodName = "auto"
     iterations: Optional[int] = None
     seed: Optional[int] = None
+    # Monte Carlo shards run on the process pool; results are reproducible per (seed, workers)
+    workers: Optional[int] = Field(default=None, ge=1, le=64)
+    # Adaptive Monte Carlo: stop once every seat's 95% half-width (equity points)
+    # is within targetError, or at maxIterations / timeLimitMs
+    targetError: Optional[float] = Field(default=None, gt=0)
+    maxIterations: Optional[int] = Field(default=None, ge=1)
+    timeLimitMs: Optional[int] = Field(default=None, ge=1)
+    # Give up (504) when no result is ready after this long; default EQUITY_DEADLINE_MS
+    deadlineMs: Optional[int] = Field(default=None, ge=1)
 
 
 class SeatEquity(BaseModel):
@@ -32,12 +41,16 @@ class SeatEquity(BaseModel):
     equity: float
     tie: float
     participating: bool
+    # 95% half-width of equity in percentage points (Monte Carlo only)
+    ci: Optional[float] = None
 
 
 class EquityResult(BaseModel):
     perSeat: List[SeatEquity]
-    method: Literal["exact", "mc"]
+    method: Literal["exact", "mc", "vectorized"]
     iterations: Optional[int] = None
+    # Largest per-seat 95% half-width (Monte Carlo only)
+    error: Optional[float] = None
 
 
 class ExpandRequest(BaseModel):
@@ -61,3 +74,13 @@ class ParseRangeRequest(BaseModel):
 class ParseRangeResponse(BaseModel):
     ok: bool
     errors: Optional[List[str]] = None
+
+
+class CacheStats(BaseModel):
+    size: int
+    maxSize: int
+    hits: int
+    diskHits: int
+    misses: int
+    evictions: int
+    disk: bool
@@ -0,0 +1,182 @@
+from app.equity.deck import (
+    COMBOS,
+    COMBO_MASKS,
+    card_to_str,
+    cards_of,
+    mask_of,
+    parse_board,
+    parse_card,
+)
+from app.equity.ranges import expand_range_text
+
+
+def test_card_ids_round_trip():
+    assert parse_card("2s") == 0
+    assert parse_card("Ac") == 51
+    assert all(parse_card(card_to_str(c)) == c for c in range(52))
+    board = parse_board(["As", "Kd", "2c"])
+    assert cards_of(mask_of(board)) == sorted(board)
+    assert len(COMBOS) == 1326
+    assert all(bin(m).count("1") == 2 for m in COMBO_MASKS)
+
+
+def test_expand_range_blocks_board_cards():
+    combos, errors = expand_range_text("AKs, QQ", parse_board(["As", "Qh"]))
+    assert not errors
+    assert len(combos) == 3 + 3
+    dead = mask_of(parse_board(["As", "Qh"]))
+    assert all(not mask_of(c) & dead for c in combos)
+
+
+def test_table_evaluator_matches_brute_force_ordering(monkeypatch):
+    import random
+    from app.equity import evaluator
+    from app.equity.evaluator import _rank7_brute, _rank7_table
+    from app.equity.tables import load_tables
+
+    noflush, flush, _ = load_tables()
+    monkeypatch.setattr(evaluator, "_NOFLUSH", noflush)
+    monkeypatch.setattr(evaluator, "_FLUSH", flush)
+    rng = random.Random(3)
+    hands = [rng.sample(range(52), 7) for _ in range(400)]
+    brute = [_rank7_brute(h) for h in hands]
+    table = [_rank7_table(h) for h in hands]
+    for i in range(len(hands) - 1):
+        for j in (i + 1, len(hands) - 1 - i):
+            assert (brute[i] > brute[j]) == (table[i] > table[j])
+            assert (brute[i] == brute[j]) == (table[i] == table[j])
+
+
+def test_rank7_batch_matches_rank7():
+    import numpy as np
+    from app.equity.evaluator import rank7, rank7_batch
+
+    rng = np.random.default_rng(5)
+    hands = np.argsort(rng.random((2000, 52)), axis=1)[:, :7]
+    # Straight flushes, quads and a wheel
+    hands = np.vstack([hands, [[48, 44, 40, 36, 32, 0, 1], [48, 49, 50, 51, 44, 45, 0], [48, 0, 4, 8, 12, 21, 30]]])
+    batch = rank7_batch(hands)
+    assert batch.tolist() == [rank7(h) for h in hands.tolist()]
+
+
+def test_combo_sampler_skips_blocked_combos():
+    import random
+    from collections import Counter
+    from app.equity.sampler import ComboSampler
+
+    combos, _ = expand_range_text("AA")
+    sampler = ComboSampler(combos, random.Random(11))
+    used = mask_of(parse_board(["As", "Ah"]))  # only AdAc is live
+    live = [i for i, c in enumerate(combos) if not mask_of(c) & used]
+    assert sampler.available(used).bit_count() == len(live) == 1
+    assert all(sampler.sample(used) == live[0] for _ in range(50))
+    assert sampler.sample(mask_of(parse_board(["As", "Ah", "Ad"]))) == -1
+
+    counts = Counter(sampler.sample(mask_of(parse_board(["As"]))) for _ in range(3000))
+    assert sorted(counts) == [i for i, c in enumerate(combos) if not mask_of(c) & mask_of(parse_board(["As"]))]
+    assert min(counts.values()) > 800
+    assert 0 < sampler.stats()["acceptance"] < 1
+
+
+def test_suit_isomorphism_groups_pairs_and_runouts():
+    from app.equity.isomorphism import board_stabilizer, canonical_pairs, fixing_combos, runout_classes
+
+    board = parse_board(["9h", "8h", "2h"])
+    stab = board_stabilizer(board)
+    assert len(stab) == 6  # permutations of the three other suits
+    combos1, _ = expand_range_text("AKs, QQ", board)
+    combos2, _ = expand_range_text("JJ, T9s", board)
+    pairs = canonical_pairs(combos1, combos2, stab)
+    live = sum(1 for a in combos1 for b in combos2 if not mask_of(a) & mask_of(b))
+    assert sum(n for _, _, n in pairs) == live
+    assert len(pairs) < live
+
+    rest = [c for c in range(52) if c not in board]
+    maps = fixing_combos(stab, [(parse_card("Ah"), parse_card("Kh"))])
+    assert sum(n for _, n in runout_classes(rest, 2, maps)) == len(rest) * (len(rest) - 1) // 2
+
+
+def test_exact_multi_matches_exact_two():
+    from app.equity.engines import compute_equity_exact_multi, compute_equity_exact_two
+    from app.models import PlayerInput
+
+    players = [
+        PlayerInput(seat="UTG", range={"text": "AKs, QQ"}),
+        PlayerInput(seat="BB", range={"text": "JJ-99, AQs"}),
+    ]
+    board = parse_board(["As", "Ks", "2s", "7d"])
+    ok2, two = compute_equity_exact_two(players, board)
+    okm, multi = compute_equity_exact_multi(players, board)
+    assert ok2 and okm
+    for a, b in zip(two, multi):
+        assert abs(a.equity - b.equity) < 1e-9 and abs(a.tie - b.tie) < 1e-9
+
+
+def test_exact_two_matches_direct_enumeration():
+    from itertools import combinations
+    from app.equity.engines import compute_equity_exact_two
+    from app.equity.evaluator import rank7
+    from app.models import PlayerInput
+
+    board = parse_board(["9h", "8h", "2c"])
+    players = [
+        PlayerInput(seat="UTG", range={"text": "AKs, QQ"}),
+        PlayerInput(seat="BB", range={"text": "JTs, 99"}),
+    ]
+    combos1, _ = expand_range_text("AKs, QQ", board)
+    combos2, _ = expand_range_text("JTs, 99", board)
+    win = tie = total = 0
+    for a in combos1:
+        for b in combos2:
+            if mask_of(a) & mask_of(b):
+                continue
+            rest = [c for c in range(52) if not mask_of([*a, *b, *board]) & (1 << c)]
+            for runout in combinations(rest, 2):
+                r1, r2 = rank7([*a, *board, *runout]), rank7([*b, *board, *runout])
+                win += r1 > r2
+                tie += r1 == r2
+                total += 1
+    ok, per_seat = compute_equity_exact_two(players, board)
+    assert ok
+    assert abs(per_seat[0].equity - (win + tie / 2) / total * 100) < 1e-9
+    assert abs(per_seat[0].tie - tie / 2 / total * 100) < 1e-9
+
+
+def test_preflop_class_sums_match_direct_count():
+    import numpy as np
+    from app.equity.deck import COMBOS
+    from app.equity.evaluator import rank7
+    from app.equity.preflop import accumulate
+    from app.equity.ranges import COMBO_CLASSES, HAND_CLASSES
+
+    boards = np.array([parse_board(["Ah", "Kh", "7d", "7c", "2h"]), parse_board(["As", "Ad", "Ac", "Kd", "Ks"])])
+    weights = np.array([3, 1])
+    wins, ties = accumulate(boards, weights)
+    for name_a, name_b in [("AKs", "AKo"), ("77", "AKs"), ("KK", "KK"), ("AA", "72o")]:
+        a_cls, b_cls = HAND_CLASSES.index(name_a), HAND_CLASSES.index(name_b)
+        w = t = 0
+        class_a = [c for c, k in zip(COMBOS, COMBO_CLASSES) if k == a_cls]
+        class_b = [c for c, k in zip(COMBOS, COMBO_CLASSES) if k == b_cls]
+        for board, weight in zip(boards.tolist(), weights.tolist()):
+            for a in class_a:
+                for b in class_b:
+                    if mask_of([*a, *board]) & mask_of(b) or mask_of(a) & mask_of(board):
+                        continue
+                    ra, rb = rank7([*a, *board]), rank7([*b, *board])
+                    w += weight * (ra > rb)
+                    t += weight * (ra == rb)
+        assert (wins[a_cls, b_cls], ties[a_cls, b_cls]) == (w, t)
+
+
+def test_compiled_range_cache_and_blockers():
+    from app.equity.ranges import blocked_mask, combos_of_mask, compile_range
+
+    a = compile_range("AKs, QQ-TT")
+    b = compile_range("AKs QQ-TT")
+    assert a is b  # same canonical tokens, one compiled range
+    assert bin(a.mask).count("1") == 4 + 18 and not a.errors
+    assert compile_range("AKs, zz").errors == ("Unrecognized token: zz",)
+    board = parse_board(["As", "Qh"])
+    live = combos_of_mask(a.mask & ~blocked_mask(board))
+    assert live == expand_range_text("AKs, QQ-TT", board)[0]
+    assert len(live) == 3 + 3 + 12
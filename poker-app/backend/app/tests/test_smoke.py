@@ -1,5 +1,6 @@
 from fastapi.testclient import TestClient
 from app.main import app
+from app.equity.cache import RESULT_CACHE, ResultCache
 
 
 client = TestClient(app)
@@ -51,3 +52,110 @@ def test_equity_postflop():
     assert r.status_code == 200
     data = r.json()
     assert len(data["perSeat"]) == 2
+
+
+def test_equity_vectorized():
+    req = {
+        "players": [
+            {"seat": "UTG", "folded": False, "range": {"text": "AA"}},
+            {"seat": "BB", "folded": False, "range": {"text": "KK"}},
+            {"seat": "BTN", "folded": True, "range": {"text": "QQ"}},
+        ],
+        "method": "vectorized",
+        "iterations": 50000,
+        "seed": 7,
+    }
+    r = client.post("/equity/preflop", json=req)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["method"] == "vectorized"
+    assert data["iterations"] == 50000
+    utg, bb, btn = data["perSeat"]
+    assert abs(utg["equity"] - 81.9) < 1.0
+    assert abs(utg["equity"] + bb["equity"] - 100.0) < 1e-6
+    assert not btn["participating"]
+
+
+def test_equity_parallel_is_reproducible():
+    req = {
+        "players": [
+            {"seat": "UTG", "folded": False, "range": {"text": "AKs, AKo, QQ-TT"}},
+            {"seat": "CO", "folded": False, "range": {"text": "22+, ATs+"}},
+            {"seat": "BB", "folded": False, "range": {"text": "JJ-99, AQs-AJs, KQs, JTo+"}},
+        ],
+        "method": "mc",
+        "iterations": 3000,
+        "seed": 99,
+        "workers": 3,
+    }
+    first = client.post("/equity/preflop", json=req)
+    RESULT_CACHE.clear()
+    second = client.post("/equity/preflop", json=req)
+    assert first.status_code == 200
+    assert first.json() == second.json()
+    assert abs(sum(s["equity"] for s in first.json()["perSeat"]) - 100.0) < 1e-6
+    vec = client.post("/equity/preflop", json={**req, "method": "vectorized"})
+    assert vec.json()["iterations"] == 3000
+
+
+def test_equity_adaptive_stops_at_target():
+    players = [
+        {"seat": "UTG", "folded": False, "range": {"text": "AA"}},
+        {"seat": "BB", "folded": False, "range": {"text": "72o"}},
+    ]
+    req = {"players": players, "method": "mc", "targetError": 1.0, "seed": 5}
+    r = client.post("/equity/preflop", json=req)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["error"] <= 1.0
+    assert data["iterations"] < 20000
+    assert all(s["ci"] <= 1.0 for s in data["perSeat"])
+    # The cap wins over an unreachable target
+    capped = client.post("/equity/preflop", json={**req, "targetError": 0.01, "maxIterations": 3000})
+    assert capped.json()["iterations"] == 3000
+    assert capped.json()["error"] > 0.01
+
+
+def test_equity_multiway_river_is_exact():
+    req = {
+        "players": [
+            {"seat": "UTG", "folded": False, "range": {"text": "AA,KK,AKs"}},
+            {"seat": "CO", "folded": False, "range": {"text": "QQ+,T9s"}},
+            {"seat": "BTN", "folded": False, "range": {"text": "22-55,A5s"}},
+        ],
+        "board": ["7h", "7d", "2c", "2s", "Ah"],
+    }
+    r = client.post("/equity/postflop", json=req)
+    assert r.status_code == 200
+    data = r.json()
+    assert data["method"] == "exact"
+    assert [round(s["equity"], 4) for s in data["perSeat"]] == [77.4671, 12.3355, 10.1974]
+
+
+def test_equity_cache_hits_isomorphic_requests(tmp_path):
+    req = {
+        "players": [
+            {"seat": "UTG", "folded": False, "range": {"text": "AKs, QQ"}},
+            {"seat": "BB", "folded": False, "range": {"text": "JJ-99, AQs"}},
+        ],
+        "board": ["As", "Ks", "2s", "7d"],
+    }
+    RESULT_CACHE.clear()
+    first = client.post("/equity/postflop", json=req).json()
+    # Hearts and spades swapped, seats relabelled: same question
+    rotated = {
+        "players": [{**req["players"][0], "seat": "CO"}, {**req["players"][1], "seat": "SB"}],
+        "board": ["Ah", "Kh", "2h", "7d"],
+    }
+    second = client.post("/equity/postflop", json=rotated).json()
+    assert [s["seat"] for s in second["perSeat"]] == ["CO", "SB"]
+    assert [s["equity"] for s in second["perSeat"]] == [s["equity"] for s in first["perSeat"]]
+    stats = client.get("/cache/stats").json()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    # The SQLite tier is shared between cache instances
+    db = str(tmp_path / "results.db")
+    ResultCache(db_path=db).put("k", {"perSeat": [], "method": "exact"})
+    other = ResultCache(db_path=db)
+    assert other.get("k") == {"perSeat": [], "method": "exact"}
+    assert other.stats()["diskHits"] == 1
@@ -1,4 +1,4 @@
-export type MethodName = "auto" | "exact" | "mc";
+export type MethodName = "auto" | "exact" | "mc" | "vectorized";
 
 export type Card = string; // e.g., "As"
 
@@ -16,6 +16,10 @@ export type EquityRequest = {
   method: MethodName;
   iterations?: number;
   seed?: number;
+  workers?: number;
+  targetError?: number;
+  maxIterations?: number;
+  timeLimitMs?: number;
 };
 
 export type SeatEquity = {
@@ -23,12 +27,14 @@ export type SeatEquity = {
   equity: number;
   tie: number;
   participating: boolean;
+  ci?: number;
 };
 
 export type EquityResult = {
   perSeat: SeatEquity[];
-  method: "exact" | "mc";
+  method: "exact" | "mc" | "vectorized";
   iterations?: number;
+  error?: number;
 };
 
 export type ExpandRequest = { range: string; board?: Card[] };